@@ -0,0 +1,219 @@
+import argparse
+import datetime
+import glob
+import gzip
+import json
+import os
+from collections import defaultdict
+
+ARCHIVE_DIR = os.getenv("TICKET_ARCHIVE_DIR", "archive")
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", 180))
+
+WRITABLE_TYPES = ("title", "rich_text", "select", "date")
+
+
+def archive_cutoff(days=ARCHIVE_AFTER_DAYS, today=None):
+    """Closed tickets submitted before this date belong in the archive."""
+    return (today or datetime.date.today()) - datetime.timedelta(days=days)
+
+
+def hot_ticket_filter(cutoff):
+    """Notion filter for live tickets plus closed tickets submitted on or after the cutoff."""
+    return {"or": [
+        {"property": "Status", "select": {"does_not_equal": "Closed"}},
+        {"property": "Date Submitted", "date": {"on_or_after": cutoff.isoformat()}},
+        {"property": "Date Submitted", "date": {"is_empty": True}},
+    ]}
+
+
+def cold_ticket_filter(cutoff):
+    """Notion filter for closed tickets submitted before the cutoff."""
+    return {"and": [
+        {"property": "Status", "select": {"equals": "Closed"}},
+        {"property": "Date Submitted", "date": {"before": cutoff.isoformat()}},
+    ]}
+
+
+def query_pages(notion, data_source_id, query_filter=None, governor=None, filter_properties=None):
+    """Yield every page of a data source query, following pagination.
+
+    With a RateGovernor, each request waits for Notion budget and is retried after a 429.
+    `filter_properties` limits the properties returned to the given property IDs.
+    """
+    start_cursor = None
+    while True:
+        kwargs = {"data_source_id": data_source_id,
+                  "sorts": [{"timestamp": "created_time", "direction": "ascending"}]}
+        if query_filter:
+            kwargs["filter"] = query_filter
+        if filter_properties:
+            kwargs["filter_properties"] = filter_properties
+        if start_cursor:
+            kwargs["start_cursor"] = start_cursor
+
+        if governor:
+            results = governor.call("notion", notion.data_sources.query, **kwargs)
+        else:
+            results = notion.data_sources.query(**kwargs)
+        yield from results["results"]
+
+        if not results.get("has_more", False):
+            break
+        start_cursor = results.get("next_cursor")
+
+
+def partition_key(page):
+    """Archive partition for a page: the YYYY-MM it was submitted in."""
+    date = page["properties"].get("Date Submitted", {}).get("date")
+    return date["start"][:7] if date and date.get("start") else "undated"
+
+
+def write_archive(pages, archive_dir=ARCHIVE_DIR):
+    """Append raw pages to gzip JSONL partitions, one file per submission month."""
+    by_partition = defaultdict(list)
+    for page in pages:
+        by_partition[partition_key(page)].append(page)
+
+    os.makedirs(archive_dir, exist_ok=True)
+    for partition, partition_pages in by_partition.items():
+        path = os.path.join(archive_dir, f"{partition}.jsonl.gz")
+        with gzip.open(path, "at", encoding="utf-8") as f:
+            for page in partition_pages:
+                f.write(json.dumps(page) + "\n")
+
+    return {partition: len(partition_pages) for partition, partition_pages in by_partition.items()}
+
+
+def archived_partitions(archive_dir=ARCHIVE_DIR):
+    """List the YYYY-MM partitions present in the local archive."""
+    paths = glob.glob(os.path.join(archive_dir, "*.jsonl.gz"))
+    return sorted(os.path.basename(path)[:-len(".jsonl.gz")] for path in paths)
+
+
+def partition_month_name(partition):
+    """Month name ("January") of a YYYY-MM partition, or None for undated ones."""
+    try:
+        return datetime.datetime.strptime(partition, "%Y-%m").strftime("%B")
+    except ValueError:
+        return None
+
+
+def archived_month_names(archive_dir=ARCHIVE_DIR):
+    names = {partition_month_name(partition) for partition in archived_partitions(archive_dir)}
+    return sorted(name for name in names if name)
+
+
+def read_archive(month_name=None, archive_dir=ARCHIVE_DIR):
+    """Read archived pages, limited to partitions of the given month name when one is passed."""
+    pages = {}
+    for partition in archived_partitions(archive_dir):
+        if month_name and partition_month_name(partition) != month_name:
+            continue
+        with gzip.open(os.path.join(archive_dir, f"{partition}.jsonl.gz"), "rt", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    page = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # truncated tail from an interrupted append
+                pages[page["id"]] = page
+    return list(pages.values())
+
+
+def writable_properties(props):
+    """Convert page properties as Notion returns them into the shape pages.create accepts."""
+    properties = {}
+    for name, prop in props.items():
+        prop_type = prop.get("type") or next((t for t in WRITABLE_TYPES if t in prop), None)
+        if prop_type not in WRITABLE_TYPES:
+            continue
+
+        value = prop.get(prop_type)
+        if prop_type in ("title", "rich_text"):
+            properties[name] = {prop_type: [
+                {"text": {"content": segment.get("plain_text") or segment.get("text", {}).get("content", "")}}
+                for segment in value or []
+            ]}
+        elif prop_type == "select":
+            properties[name] = {"select": {"name": value["name"]} if value and value.get("name") else None}
+        elif prop_type == "date":
+            properties[name] = {"date": {"start": value["start"]} if value and value.get("start") else None}
+    return properties
+
+
+def page_title(page):
+    """Text of a page's ID title, which is how archive copies are matched to their originals."""
+    title = page["properties"].get("ID", {}).get("title") or []
+    return "".join(segment.get("plain_text") or segment.get("text", {}).get("content", "") for segment in title)
+
+
+def archive_closed_tickets(notion, data_source_id, cutoff, archive_dir=ARCHIVE_DIR, archive_data_source_id=None,
+                           keep_in_notion=False, dry_run=False):
+    """Move closed tickets submitted before the cutoff out of the live data source.
+
+    Pages are written to the local archive first. Only with an archive data source are
+    they also moved to the Notion trash, each one after its copy there has been read
+    back and matches; without one, or with keep_in_notion, the pages stay live.
+
+    Reruns are safe: pages already in the local archive are not appended again, and
+    pages that already have a copy in the archive data source are not copied again.
+    """
+    pages = list(query_pages(notion, data_source_id, cold_ticket_filter(cutoff)))
+    print(f"📦 {len(pages)} closed ticket(s) submitted before {cutoff.isoformat()}")
+    if dry_run or not pages:
+        return 0
+
+    archived = {page["id"] for page in read_archive(archive_dir=archive_dir)}
+    new_pages = [page for page in pages if page["id"] not in archived]
+    for partition, count in sorted(write_archive(new_pages, archive_dir).items()):
+        print(f"  {partition}: {count} ticket(s) archived to {archive_dir}")
+    if len(new_pages) < len(pages):
+        print(f"  {len(pages) - len(new_pages)} ticket(s) were already in {archive_dir}")
+
+    if not archive_data_source_id:
+        print("⚠️ No archive data source given, so the pages are kept in the live data source")
+        return 0
+
+    copies = {page_title(copy): copy["id"]
+              for copy in query_pages(notion, archive_data_source_id, filter_properties=["title"])}
+    moved = 0
+    for page in pages:
+        copy_id = copies.get(page_title(page))
+        if copy_id and keep_in_notion:
+            continue
+        try:
+            properties = writable_properties(page["properties"])
+            if not copy_id:
+                copy_id = notion.pages.create(parent={"data_source_id": archive_data_source_id},
+                                              properties=properties)["id"]
+            copied = writable_properties(notion.pages.retrieve(page_id=copy_id)["properties"])
+            if any(copied.get(name) != value for name, value in properties.items()):
+                raise ValueError(f"archive copy {copy_id} does not match, page left in place")
+            if not keep_in_notion:
+                notion.pages.update(page_id=page["id"], in_trash=True)
+                moved += 1
+        except Exception as e:
+            print(f"❌ Error archiving page {page['id']}: {e}")
+
+    print(f"✅ {moved} ticket(s) moved out of the live data source")
+    return moved
+
+
+if __name__ == "__main__":
+    from notion_client import Client
+
+    parser = argparse.ArgumentParser(description="Archive old closed tickets out of the live Notion data source.")
+    parser.add_argument("--days", type=int, default=ARCHIVE_AFTER_DAYS,
+                        help="archive closed tickets submitted more than this many days ago")
+    parser.add_argument("--archive-dir", default=ARCHIVE_DIR)
+    parser.add_argument("--archive-data-source", default=os.getenv("ARCHIVE_DATASOURCE_ID"),
+                        help="copy archived tickets into this Notion data source and trash the originals "
+                             "once their copy is verified; without it pages stay in the live data source")
+    parser.add_argument("--keep-in-notion", action="store_true",
+                        help="copy to the archive data source but leave the pages in the live data source")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    notion = Client(auth=os.environ["NOTION_TOKEN"])
+    data_source_id = os.getenv("NOTION_DATASOURCE_ID") or os.environ["NOTION_DATABASE_ID"]
+    archive_closed_tickets(notion, data_source_id, archive_cutoff(args.days), args.archive_dir,
+                           args.archive_data_source, args.keep_in_notion, args.dry_run)
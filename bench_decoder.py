@@ -0,0 +1,154 @@
+"""Benchmark the ticket page decoder against the old per-row dict parsing.
+
+Builds synthetic Notion pages shaped like the ticket data source (a share of them with
+Issue and Comments split over several rich_text segments, as Notion does past 2000
+characters) and times turning them into a DataFrame both ways, with peak memory. The old
+parser keeps only the first segment of each value, so the text it drops is reported too:
+it accounts for the difference in peak memory.
+
+    python bench_decoder.py --pages 100000
+"""
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+
+import pandas as pd
+
+from ticket_schema import RICH_TEXT_LIMIT, columns_frame, decode_pages
+
+NAMES = ["Huzaifa Sabah Uddin", "Ayesha Khan", "Bilal Ahmed", "Sara Malik", "Usman Tariq"]
+
+
+def legacy_parse_ticket_page(page):
+    """The per-row decoder the app and reminder used before, which keeps only rich_text[0]."""
+    props = page["properties"]
+    ticket_id = props["ID"]["title"][0]["text"]["content"] if props["ID"]["title"] else ""
+    if not ticket_id or "-" not in ticket_id:
+        ticket_id = "TICKET-0001"
+
+    return {
+        "page_id": page["id"],
+        "ID": ticket_id,
+        "Issue": props["Issue"]["rich_text"][0]["text"]["content"] if props["Issue"]["rich_text"] else "",
+        "Status": props["Status"]["select"]["name"] if props["Status"]["select"] else "Open",
+        "Priority": props["Priority"]["select"]["name"] if props["Priority"]["select"] else "Medium",
+        "Date Submitted": props["Date Submitted"]["date"]["start"] if props["Date Submitted"]["date"] else "",
+        "Submitted Time": props["Submitted Time"]["rich_text"][0]["text"]["content"]
+        if props["Submitted Time"]["rich_text"] else "",
+        "Created By": props["Created By"]["select"]["name"] if props["Created By"]["select"]["name"] else "",
+        "Assigned To": props["Assigned To"]["select"]["name"] if props["Assigned To"]["select"]["name"] else "",
+        "Resolved Date": props["Resolved Date"]["date"]["start"]
+        if props.get("Resolved Date") and props["Resolved Date"]["date"] else None,
+        "Resolved Time": props["Resolved Time"]["rich_text"][0]["text"]["content"]
+        if props["Resolved Time"]["rich_text"] else "",
+        "Comments": props["Comments"]["rich_text"][0]["text"]["content"] if props["Comments"]["rich_text"] else "",
+        "Ticket Type": props["Ticket Type"]["rich_text"][0]["text"]["content"]
+        if props["Ticket Type"]["rich_text"] else "",
+        "Notify": props["Notify"]["rich_text"][0]["text"]["content"] if props["Notify"]["rich_text"] else "",
+    }
+
+
+def text(value):
+    segments = [value[i:i + RICH_TEXT_LIMIT] for i in range(0, len(value), RICH_TEXT_LIMIT)]
+    return {"type": "rich_text", "rich_text": [{"type": "text", "text": {"content": segment}, "plain_text": segment}
+                                               for segment in segments]}
+
+
+def fake_page(number, rng, long_share):
+    issue = f"Order #{number}: " + "Deliver to client address, contact details and notes. " * rng.randint(1, 8)
+    if rng.random() < long_share:
+        issue *= 60
+    status = rng.choice(["Open", "In Progress", "Closed"])
+    closed = status == "Closed"
+    return {
+        "id": f"page-{number}",
+        "properties": {
+            "ID": {"type": "title", "title": [{"type": "text", "text": {"content": f"TICKET-{number}"},
+                                               "plain_text": f"TICKET-{number}"}]},
+            "Issue": text(issue),
+            "Status": {"type": "select", "select": {"name": status}},
+            "Priority": {"type": "select", "select": {"name": rng.choice(["High", "Medium", "Low"])}},
+            "Date Submitted": {"type": "date",
+                               "date": {"start": f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"}},
+            "Submitted Time": text("10:30 AM"),
+            "Created By": {"type": "select", "select": {"name": rng.choice(NAMES)}},
+            "Assigned To": {"type": "select", "select": {"name": rng.choice(NAMES)}},
+            "Resolved Date": {"type": "date", "date": {"start": "2026-12-31"} if closed else None},
+            "Resolved Time": text("04:00 PM" if closed else ""),
+            "Comments": text("Followed up with the client. " * (rng.randint(0, 3) * (80 if closed else 1))),
+            "Ticket Type": text(rng.choice(["Normal", "Personal"])),
+            "Notify": text("Yes"),
+        },
+    }
+
+
+def first_segments(page):
+    """The page with every text property cut to its first segment, which is all the old parser reads."""
+    properties = {name: dict(prop, **{prop["type"]: prop[prop["type"]][:1]}) if prop["type"] in ("title", "rich_text")
+                  else prop for name, prop in page["properties"].items()}
+    return dict(page, properties=properties)
+
+
+def legacy_decode(pages):
+    return [legacy_parse_ticket_page(page) for page in pages]
+
+
+def measure(decode, build, pages, repeat):
+    """Best decode and DataFrame build times over `repeat` runs, peak traced memory of one run, and the frame."""
+    decode_times, frame_times = [], []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        decoded = decode(pages)
+        decoded_at = time.perf_counter()
+        df = build(decoded)
+        decode_times.append(decoded_at - started)
+        frame_times.append(time.perf_counter() - decoded_at)
+        del decoded, df
+
+    gc.collect()
+    tracemalloc.start()
+    df = build(decode(pages))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(decode_times), min(frame_times), peak, df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Notion page decoding into a ticket DataFrame.")
+    parser.add_argument("--pages", type=int, default=100_000)
+    parser.add_argument("--long-share", type=float, default=0.02,
+                        help="share of pages whose Issue spans several rich_text segments")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    pages = [fake_page(number, rng, args.long_share) for number in range(1, args.pages + 1)]
+    print(f"Decoding {len(pages):,} pages, best of {args.repeat}")
+
+    results = {}
+    print(f"  {'':<17} {'decode':>8} {'DataFrame':>10} {'total':>8} {'pages/s':>10} {'peak MB':>8}")
+    # The last line decodes the same text the old parser keeps, to compare like with like.
+    first_only = [first_segments(page) for page in pages]
+    for name, decode, build, decoded_pages in (("per-row dicts", legacy_decode, pd.DataFrame, pages),
+                                               ("columnar decoder", decode_pages, columns_frame, pages),
+                                               ("  same text", decode_pages, columns_frame, first_only)):
+        decode_s, frame_s, peak, df = measure(decode, build, decoded_pages, args.repeat)
+        results[name] = df
+        total = decode_s + frame_s
+        print(f"  {name:<17} {decode_s:7.3f}s {frame_s:9.3f}s {total:7.3f}s {len(pages) / total:>10,.0f} "
+              f"{peak / 2 ** 20:8.1f}")
+
+    legacy, columnar = results["per-row dicts"], results["columnar decoder"]
+    for column in ("Issue", "Comments"):
+        truncated = (legacy[column].str.len() < columnar[column].str.len()).sum()
+        dropped = (columnar[column].str.len() - legacy[column].str.len()).sum()
+        print(f"  {column}: {truncated:,} value(s) truncated by the per-row decoder, "
+              f"{dropped / 2 ** 20:.1f} MB of text dropped")
+
+
+if __name__ == "__main__":
+    main()
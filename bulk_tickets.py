@@ -0,0 +1,281 @@
+import argparse
+import csv
+import datetime
+import json
+import os
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from archive import ARCHIVE_DIR, query_pages, read_archive
+from rate_governor import NOTION_BUDGETS, SLACK_BUDGETS, RateGovernor
+from ticket_schema import (PRIORITIES, STATUSES, TICKET_COLUMNS, parse_date, parse_ticket_page, ticket_number,
+                           ticket_properties)
+
+PKT = datetime.timezone(datetime.timedelta(hours=5), "PKT")
+
+BATCH_SIZE = 100
+WORKERS = 4
+
+
+def export_tickets(notion, data_source_id, output, include_archive=False, archive_dir=ARCHIVE_DIR):
+    """Stream every ticket into a CSV file, optionally followed by the local archive."""
+    sources = [query_pages(notion, data_source_id)]
+    if include_archive:
+        sources.append(read_archive(archive_dir=archive_dir))
+
+    seen = set()
+    with open(output, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=TICKET_COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        for pages in sources:
+            for page in pages:
+                if page["id"] in seen:
+                    continue
+                seen.add(page["id"])
+                writer.writerow(parse_ticket_page(page))
+
+    print(f"✅ Exported {len(seen)} ticket(s) to {output}")
+    return len(seen)
+
+
+class ImportCheckpoint:
+    """Append-only progress log of an import so an interrupted run resumes where it stopped.
+
+    Records every row written to Notion and the ticket numbers reserved for each ID
+    block, flushed to disk after each entry so a crash loses at most the rows in flight.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.done = {}
+        self.reserved_through = 0
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # partial line left behind by a crash mid-write
+                if entry["type"] == "reserve":
+                    self.reserved_through = max(self.reserved_through, entry["through"])
+                else:
+                    self.done[entry["row"]] = entry["id"]
+
+    def _append(self, entry):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def reserve(self, through):
+        self._append({"type": "reserve", "through": through})
+        self.reserved_through = through
+
+    def record_row(self, row, ticket_id, page_id):
+        self._append({"type": "row", "row": row, "id": ticket_id, "page_id": page_id})
+        self.done[row] = ticket_id
+
+
+class IdAllocator:
+    """Hand out TICKET-n IDs from blocks reserved in the checkpoint.
+
+    Numbers are never reused after a resume: a block that was reserved but only
+    partly used before a crash is skipped rather than handed out again.
+    """
+
+    def __init__(self, latest_number, checkpoint, block_size=BATCH_SIZE):
+        self.checkpoint = checkpoint
+        self.block_size = block_size
+        self.next_number = max(latest_number, checkpoint.reserved_through) + 1
+
+    def take(self):
+        if self.next_number > self.checkpoint.reserved_through:
+            self.checkpoint.reserve(self.next_number + self.block_size - 1)
+        number = self.next_number
+        self.next_number += 1
+        return f"TICKET-{number}"
+
+
+def ticket_numbers_in_use(notion, data_source_id, governor):
+    """Numbers of every ticket in the data source, read from a title-only query."""
+    return {ticket_number(parse_ticket_page(page)["ID"])
+            for page in query_pages(notion, data_source_id, governor=governor, filter_properties=["title"])}
+
+
+def csv_ticket_numbers(path):
+    """Numbers of the IDs a CSV file gives explicitly."""
+    with open(path, newline="", encoding="utf-8") as f:
+        return {ticket_number(row.get("ID")) for row in csv.DictReader(f)} - {0}
+
+
+def row_to_ticket(row, now):
+    """Validate a CSV row into a ticket dict, raising ValueError for rows that cannot be imported."""
+    ticket = {column: (row.get(column) or "").strip() for column in TICKET_COLUMNS}
+    if not ticket["Issue"]:
+        raise ValueError("Issue is empty")
+    if not ticket["Created By"] or not ticket["Assigned To"]:
+        raise ValueError("Created By and Assigned To are required")
+    if ticket["ID"] and not ticket_number(ticket["ID"]):
+        raise ValueError(f"ID {ticket['ID']!r} is not of the form TICKET-<number>")
+
+    ticket["Status"] = ticket["Status"] or "Open"
+    ticket["Priority"] = ticket["Priority"] or "Medium"
+    if ticket["Status"] not in STATUSES:
+        raise ValueError(f"Status must be one of {', '.join(STATUSES)}")
+    if ticket["Priority"] not in PRIORITIES:
+        raise ValueError(f"Priority must be one of {', '.join(PRIORITIES)}")
+
+    for column in ("Date Submitted", "Resolved Date"):
+        if ticket[column]:
+            date = parse_date(ticket[column])
+            if date is None:
+                raise ValueError(f"Unrecognised {column} {ticket[column]!r}")
+            ticket[column] = date
+    ticket["Date Submitted"] = ticket["Date Submitted"] or now.date().isoformat()
+    ticket["Submitted Time"] = ticket["Submitted Time"] or now.strftime("%I:%M %p")
+    return ticket
+
+
+def import_tickets(notion, data_source_id, path, checkpoint_path=None, batch_size=BATCH_SIZE, workers=WORKERS,
+                   dry_run=False):
+    """Create a ticket page for every CSV row, a batch at a time with concurrent rate-limited writes.
+
+    Rows that keep an ID column keep their ID unless a ticket already has it; the others
+    get new numbers after the highest one in Notion or the CSV. Returns the tickets
+    written, for notifications.
+    """
+    checkpoint = ImportCheckpoint(checkpoint_path or f"{path}.checkpoint.jsonl")
+    governor = RateGovernor(NOTION_BUDGETS)
+    allocator = None
+    in_use = None
+    seen_ids = set()
+    now = datetime.datetime.now(PKT)
+    stats = Counter()
+    written = []
+
+    def write_batch(batch):
+        for _, ticket in batch:
+            ticket["ID"] = ticket["ID"] or allocator.take()
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(governor.call, "notion", notion.pages.create,
+                                   parent={"data_source_id": data_source_id},
+                                   properties=ticket_properties(ticket)): (row, ticket)
+                       for row, ticket in batch}
+            for future in as_completed(futures):
+                row, ticket = futures[future]
+                try:
+                    page = future.result()
+                except Exception as e:
+                    print(f"❌ Row {row} ({ticket['ID']}): {e}")
+                    stats["failed"] += 1
+                    continue
+                checkpoint.record_row(row, ticket["ID"], page["id"])
+                written.append(ticket)
+                stats["imported"] += 1
+        print(f"  {stats['imported']} imported, {stats['failed']} failed, {stats['invalid']} invalid so far")
+
+    with open(path, newline="", encoding="utf-8") as f:
+        batch = []
+        for row, values in enumerate(csv.DictReader(f), start=1):
+            if row in checkpoint.done:
+                stats["skipped"] += 1
+                continue
+            try:
+                ticket = row_to_ticket(values, now)
+                if ticket["ID"] and ticket_number(ticket["ID"]) in seen_ids:
+                    raise ValueError(f"ID {ticket['ID']} appears more than once in the file")
+            except ValueError as e:
+                print(f"⚠️ Row {row}: {e}")
+                stats["invalid"] += 1
+                continue
+            if ticket["ID"]:
+                seen_ids.add(ticket_number(ticket["ID"]))
+            if dry_run:
+                stats["valid"] += 1
+                continue
+
+            if allocator is None:
+                in_use = ticket_numbers_in_use(notion, data_source_id, governor)
+                allocator = IdAllocator(max(in_use | csv_ticket_numbers(path), default=0), checkpoint, batch_size)
+            if ticket["ID"] and ticket_number(ticket["ID"]) in in_use:
+                print(f"⚠️ Row {row}: {ticket['ID']} already exists in Notion")
+                stats["invalid"] += 1
+                continue
+            batch.append((row, ticket))
+            if len(batch) >= batch_size:
+                write_batch(batch)
+                batch = []
+        if batch:
+            write_batch(batch)
+
+    print(f"✅ {dict(stats)}")
+    return written
+
+
+def notify_imported(bot, names, tickets):
+    """Send each assignee one DM listing the live tickets imported for them."""
+    governor = RateGovernor(SLACK_BUDGETS)
+    by_assignee = defaultdict(list)
+    for ticket in tickets:
+        if ticket["Status"] != "Closed":
+            by_assignee[ticket["Assigned To"]].append(ticket["ID"])
+
+    for name, ticket_ids in by_assignee.items():
+        email = names.get(name)
+        if not email:
+            print(f"⚠️ No email found for '{name}'")
+            continue
+        try:
+            user_id = governor.call("users.lookupByEmail", bot.users_lookupByEmail, email=email)["user"]["id"]
+            shown = ", ".join(sorted(ticket_ids, key=ticket_number)[:50])
+            more = f" and {len(ticket_ids) - 50} more" if len(ticket_ids) > 50 else ""
+            governor.call("chat.postMessage", bot.chat_postMessage, channel=user_id,
+                          text=f"📥 *{len(ticket_ids)} ticket(s) were imported and assigned to you:*\n{shown}{more}")
+            print(f"✅ Import summary sent to {name}")
+        except Exception as e:
+            print(f"❌ Error sending import summary to {name}: {e}")
+
+
+if __name__ == "__main__":
+    from notion_client import Client
+
+    parser = argparse.ArgumentParser(description="Bulk export tickets to CSV or import them from CSV.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="write every ticket to a CSV file")
+    export_parser.add_argument("output")
+    export_parser.add_argument("--include-archive", action="store_true",
+                               help="also export tickets from the local archive")
+    export_parser.add_argument("--archive-dir", default=ARCHIVE_DIR)
+
+    import_parser = commands.add_parser("import", help="create tickets from a CSV file with the export's columns")
+    import_parser.add_argument("csv")
+    import_parser.add_argument("--checkpoint", help="progress file (default: <csv>.checkpoint.jsonl)")
+    import_parser.add_argument("--batch-size", type=int, default=BATCH_SIZE,
+                               help="rows written per batch and ticket numbers reserved per ID block")
+    import_parser.add_argument("--workers", type=int, default=WORKERS)
+    import_parser.add_argument("--no-notify", action="store_true",
+                               help="do not send assignees a summary of their imported tickets")
+    import_parser.add_argument("--dry-run", action="store_true", help="only validate the rows")
+    args = parser.parse_args()
+
+    notion = Client(auth=os.environ["NOTION_TOKEN"])
+    data_source_id = os.getenv("NOTION_DATASOURCE_ID") or os.environ["NOTION_DATABASE_ID"]
+
+    if args.command == "export":
+        export_tickets(notion, data_source_id, args.output, args.include_archive, args.archive_dir)
+    else:
+        imported = import_tickets(notion, data_source_id, args.csv, args.checkpoint, args.batch_size, args.workers,
+                                  args.dry_run)
+        if imported and not args.no_notify:
+            from slack_sdk import WebClient
+
+            notify_imported(WebClient(token=os.environ["SLACK_BOT_TOKEN"]), json.loads(os.getenv("NAMES") or "{}"),
+                            imported)
@@ -0,0 +1,85 @@
+import datetime
+import threading
+import time
+
+
+def parse_working_hours(value):
+    """(start_hour, end_hour) from "9-18"."""
+    start, end = str(value).split("-")
+    return int(start), int(end)
+
+
+def parse_working_days(value):
+    """Weekday numbers (Monday is 0) from "0-4" or "0,1,2,3,4,5"."""
+    days = set()
+    for part in str(value).split(","):
+        if "-" in part:
+            start, end = part.split("-")
+            days.update(range(int(start), int(end) + 1))
+        elif part.strip():
+            days.add(int(part))
+    return days
+
+
+class CacheWarmer:
+    """Keep a cache warm by refreshing it from a background thread.
+
+    `refresh()` is called once at start and then every `interval` seconds, or every
+    `busy_interval` seconds during working hours in `tz`, so reruns read data that is
+    already loaded instead of waiting on the backend. A failed refresh is logged and
+    retried on the next tick; whatever was loaded before stays in place.
+    """
+
+    def __init__(self, refresh, interval=600, busy_interval=60, working_hours=(9, 18), working_days=range(5),
+                 tz=datetime.timezone.utc):
+        self.refresh = refresh
+        self.interval = interval
+        self.busy_interval = busy_interval
+        self.working_hours = working_hours
+        self.working_days = set(working_days)
+        self.tz = tz
+        self.lock = threading.Lock()
+        self.stats = {"refreshes": 0, "errors": 0, "last_error": None, "last_refresh_at": None,
+                      "last_duration_s": None}
+        self.wakeup = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="cache-warmer", daemon=True)
+        self.thread.start()
+
+    def is_busy(self, now=None):
+        now = now or datetime.datetime.now(self.tz)
+        start, end = self.working_hours
+        return now.weekday() in self.working_days and start <= now.hour < end
+
+    def next_interval(self):
+        return self.busy_interval if self.is_busy() else self.interval
+
+    def wake(self):
+        """Refresh now instead of at the next tick."""
+        self.wakeup.set()
+
+    def _run(self):
+        while True:
+            started = time.perf_counter()
+            try:
+                self.refresh()
+                with self.lock:
+                    self.stats["refreshes"] += 1
+                    self.stats["last_refresh_at"] = time.time()
+            except Exception as e:
+                print(f"❌ Error warming cache: {e}")
+                with self.lock:
+                    self.stats["errors"] += 1
+                    self.stats["last_error"] = str(e)
+            with self.lock:
+                self.stats["last_duration_s"] = round(time.perf_counter() - started, 3)
+
+            self.wakeup.wait(self.next_interval())
+            self.wakeup.clear()
+
+    def snapshot(self):
+        with self.lock:
+            stats = dict(self.stats)
+        stats["busy"] = self.is_busy()
+        stats["interval_s"] = self.next_interval()
+        stats["age_s"] = round(time.time() - stats["last_refresh_at"], 1) if stats["last_refresh_at"] else None
+        return stats
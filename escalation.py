@@ -0,0 +1,190 @@
+import datetime
+import heapq
+import json
+import os
+
+import pandas as pd
+
+# Tickets are submitted with a Pakistan date and time; PKT has no daylight saving.
+PKT = datetime.timezone(datetime.timedelta(hours=5), "PKT")
+
+DEFAULT_SLA_HOURS = {"High": 24, "Medium": 72, "Low": 168}
+
+# No ticket text: the saved index is cached between CI runs. Callers look the Issue up themselves.
+INDEXED_FIELDS = ["ID", "Priority", "Assigned To", "Date Submitted", "Submitted Time"]
+
+
+def submitted_at(date_submitted, submitted_time):
+    """Epoch seconds of a ticket's submission from its PKT date and "%I:%M %p" time, or None."""
+    date = pd.to_datetime(date_submitted, errors="coerce")
+    if pd.isna(date):
+        return None
+
+    moment = datetime.datetime(date.year, date.month, date.day, tzinfo=PKT)
+    try:
+        clock = datetime.datetime.strptime(str(submitted_time).strip(), "%I:%M %p")
+        moment = moment.replace(hour=clock.hour, minute=clock.minute)
+    except ValueError:
+        pass
+    return moment.timestamp()
+
+
+def reminded_tickets(df):
+    """The tickets the per-person reminder lists: not muted, not print orders and not personal."""
+    mask = (df["Notify"] == "Yes") & (df["Category"] != "Printing") & (df["Created By"] != df["Assigned To"])
+    if "Ticket Type" in df.columns:
+        mask &= df["Ticket Type"] != "Personal"
+    return df[mask]
+
+
+class EscalationIndex:
+    """SLA deadline index of open tickets that is kept up to date incrementally.
+
+    A ticket's deadline is its submission time plus the SLA hours for its priority.
+    Deadlines sit in min-heaps (one global, one per assignee) with lazy deletion:
+    sync() only re-keys tickets whose priority, assignee or submission time changed,
+    and superseded heap entries are skipped when read instead of being searched for.
+    """
+
+    def __init__(self, sla_hours=None):
+        self.sla_hours = dict(DEFAULT_SLA_HOURS, **(sla_hours or {}))
+        self.tickets = {}
+        self.heap = []
+        self.assignee_heaps = {}
+        self.versions = {}
+
+    def _deadline(self, ticket):
+        start = submitted_at(ticket["Date Submitted"], ticket["Submitted Time"])
+        hours = self.sla_hours.get(ticket["Priority"])
+        if start is None or hours is None:
+            return None
+        return start + hours * 3600
+
+    def _push(self, page_id, entry):
+        version = self.versions.get(page_id, 0) + 1
+        self.versions[page_id] = version
+        item = (entry["deadline"], page_id, version)
+        heapq.heappush(self.heap, item)
+        heapq.heappush(self.assignee_heaps.setdefault(entry["Assigned To"], []), item)
+
+    def _is_current(self, item):
+        _, page_id, version = item
+        return page_id in self.tickets and self.versions.get(page_id) == version
+
+    @staticmethod
+    def _fields(ticket):
+        """The indexed fields of a ticket in the form they are stored and compared in."""
+        fields = {field: ticket.get(field, "") for field in INDEXED_FIELDS}
+        date = pd.to_datetime(fields["Date Submitted"], errors="coerce")
+        fields["Date Submitted"] = date.strftime("%Y-%m-%d") if pd.notna(date) else ""
+        return {field: "" if pd.isna(value) else str(value) for field, value in fields.items()}
+
+    def upsert(self, page_id, ticket):
+        """Add or re-key one open ticket; unchanged deadlines and assignees keep their heap entries."""
+        entry = self._fields(ticket)
+        entry["deadline"] = self._deadline(entry)
+
+        previous = self.tickets.get(page_id)
+        if previous and previous["deadline"] == entry["deadline"] and previous["Assigned To"] == entry["Assigned To"]:
+            previous.update(entry)
+            return
+
+        entry["escalated_on"] = previous.get("escalated_on") if previous else None
+        if previous and previous["deadline"] != entry["deadline"]:
+            entry["escalated_on"] = None
+        self.tickets[page_id] = entry
+        if entry["deadline"] is not None:
+            self._push(page_id, entry)
+
+    def remove(self, page_id):
+        """Drop a ticket that was closed or deleted; its heap entries go stale."""
+        if self.tickets.pop(page_id, None) is not None:
+            self.versions[page_id] = self.versions.get(page_id, 0) + 1
+
+    def sync(self, df):
+        """Bring the index in line with the current open tickets, touching only what changed.
+
+        Muted, printing and personal tickets are left out, as they are from the reminders.
+        """
+        df = reminded_tickets(df)
+        live = set(df["page_id"]) if not df.empty else set()
+        for page_id in set(self.tickets) - live:
+            self.remove(page_id)
+
+        for ticket in df[["page_id"] + INDEXED_FIELDS].to_dict("records"):
+            previous = self.tickets.get(ticket["page_id"])
+            if previous and all(previous[field] == value for field, value in self._fields(ticket).items()):
+                continue
+            self.upsert(ticket["page_id"], ticket)
+
+        self._compact()
+
+    def _compact(self):
+        """Rebuild heaps once stale entries outnumber live ones."""
+        if len(self.heap) <= 2 * max(len(self.tickets), 16):
+            return
+        self.heap = [item for item in self.heap if self._is_current(item)]
+        heapq.heapify(self.heap)
+        self.assignee_heaps = {}
+        for item in self.heap:
+            assignee = self.tickets[item[1]]["Assigned To"]
+            self.assignee_heaps.setdefault(assignee, []).append(item)
+        for heap in self.assignee_heaps.values():
+            heapq.heapify(heap)
+
+    def overdue(self, assignee, now, k=5):
+        """The k most overdue open tickets of an assignee, most overdue first."""
+        heap = self.assignee_heaps.get(assignee, [])
+        items = heapq.nsmallest(k, (item for item in heap if item[0] <= now and self._is_current(item)))
+        return [dict(self.tickets[page_id], page_id=page_id, hours_over=(now - deadline) / 3600)
+                for deadline, page_id, _ in items]
+
+    def escalations(self, now, run_date):
+        """Tickets past their SLA that have not been escalated before today's run."""
+        due = []
+        for deadline, page_id, version in sorted(item for item in self.heap if item[0] <= now):
+            if not self._is_current((deadline, page_id, version)):
+                continue
+            ticket = self.tickets[page_id]
+            if ticket["escalated_on"] in (None, run_date):
+                due.append(dict(ticket, page_id=page_id, hours_over=(now - deadline) / 3600))
+        return due
+
+    def mark_escalated(self, tickets, run_date):
+        for ticket in tickets:
+            if ticket["page_id"] in self.tickets:
+                self.tickets[ticket["page_id"]]["escalated_on"] = run_date
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"sla_hours": self.sla_hours, "tickets": self.tickets}, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, sla_hours=None):
+        """Load a saved index; deadlines are re-derived only if the SLA settings changed."""
+        index = cls(sla_hours)
+        if not os.path.exists(path):
+            return index
+
+        try:
+            with open(path, encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ Could not read escalation index {path}: {e}")
+            return index
+
+        sla_changed = saved.get("sla_hours") != index.sla_hours
+        for page_id, entry in saved.get("tickets", {}).items():
+            entry.pop("Issue", None)
+            if sla_changed:
+                index.upsert(page_id, entry)
+                if index.tickets[page_id]["deadline"] == entry["deadline"]:
+                    index.tickets[page_id]["escalated_on"] = entry.get("escalated_on")
+                continue
+            index.tickets[page_id] = entry
+            if entry["deadline"] is not None:
+                index._push(page_id, entry)
+        return index
@@ -0,0 +1,450 @@
+"""Concurrent-user load test for streamlit_app against stubbed Notion and Slack backends.
+
+Each simulated user is a Streamlit AppTest session that loads the dashboard, refetches,
+filters by month and creates a ticket. Admins also edit several tickets through the
+Update form, save edits to the active tickets table and run a bulk action. Reruns are
+timed per session and the report shows p50/p95 rerun latency and how many backend calls
+were made. Steps that fail or never render are errors, and the run exits non-zero unless
+every planned step completed. With --trace-memory it also shows the memory each
+session's state keeps alive.
+
+    python loadtest.py --users 20 --tickets 2000 --notion-latency 0.2
+"""
+import argparse
+import contextlib
+import gc
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import notion_client
+import pandas as pd
+import slack_sdk
+import streamlit as st
+from streamlit.runtime import Runtime
+from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+from streamlit.runtime.media_file_manager import MediaFileManager
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+from streamlit.runtime.secrets import Secrets
+from streamlit.testing.v1 import AppTest, app_test, local_script_runner
+from streamlit.testing.v1.util import patch_config_options
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(APP_DIR, "streamlit_app.py")
+
+NAMES = ["Huzaifa Sabah Uddin", "Ayesha Khan", "Bilal Ahmed", "Sara Malik", "Usman Tariq"]
+
+SECRETS = {
+    "NOTION_TOKEN": "secret-test",
+    "NOTION_DATABASE_ID": "db-test",
+    "NOTION_DATASOURCE_ID": "ds-test",
+    "ADMIN_PASSWORD": "admin-test",
+    "NAMES": NAMES,
+    "name_all": {name: f"{name.split()[0].lower()}@example.com" for name in NAMES},
+}
+
+
+class BackendCalls:
+    """Thread-safe call counter shared by the stub backends."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = Counter()
+
+    def hit(self, name, latency=0.0):
+        with self.lock:
+            self.counts[name] += 1
+        if latency:
+            time.sleep(latency)
+
+
+def rich_text(value):
+    return {"type": "rich_text", "rich_text": [{"type": "text", "text": {"content": value}, "plain_text": value}]
+            if value else []}
+
+
+def fake_page(number, rng):
+    """A Notion page shaped like the ticket data source returns it."""
+    created_by = rng.choice(NAMES)
+    assigned = rng.choice(NAMES)
+    status = rng.choices(["Open", "In Progress", "Closed"], weights=[2, 1, 5])[0]
+    submitted = pd.Timestamp("2026-01-01") + pd.Timedelta(days=rng.randrange(0, 280))
+    issue = rng.choice([
+        "Republication details for client manuscript",
+        "25 Printed Copies (Paperback)\nClient Name: John Doe\nClient Address: 3811 Ditmars Blvd, Queens, NY",
+        "Proof copy requested for cover review",
+        "Reminder: follow up with the designer",
+    ])
+    return {
+        "object": "page",
+        "id": f"page-{number:06d}",
+        "last_edited_time": (pd.Timestamp("2026-10-01T09:00") + pd.Timedelta(minutes=number)).strftime(
+            "%Y-%m-%dT%H:%M:00.000Z"),
+        "properties": {
+            "ID": {"type": "title", "title": [{"type": "text", "text": {"content": f"TICKET-{number}"},
+                                               "plain_text": f"TICKET-{number}"}]},
+            "Issue": rich_text(issue),
+            "Status": {"type": "select", "select": {"name": status}},
+            "Priority": {"type": "select", "select": {"name": rng.choice(["High", "Medium", "Low"])}},
+            "Date Submitted": {"type": "date", "date": {"start": submitted.strftime("%Y-%m-%d")}},
+            "Submitted Time": rich_text("10:30 AM"),
+            "Created By": {"type": "select", "select": {"name": created_by}},
+            "Assigned To": {"type": "select", "select": {"name": assigned}},
+            "Resolved Date": {"type": "date", "date": None},
+            "Resolved Time": rich_text(""),
+            "Comments": rich_text(""),
+            "Ticket Type": rich_text("Personal" if created_by == assigned else "Normal"),
+            "Notify": rich_text("Yes"),
+        },
+    }
+
+
+def filtered(page, filter_properties):
+    """The page with only the requested properties, as filter_properties returns it; ids are the names here."""
+    if not filter_properties:
+        return page
+    return {**page, "properties": {name: prop for name, prop in page["properties"].items()
+                                   if name in filter_properties}}
+
+
+class StubNotion:
+    """In-memory stand-in for notion_client.Client covering the calls the app makes."""
+
+    pages_store = []
+    calls = None
+    latency = 0.0
+
+    def __init__(self, *args, **kwargs):
+        self.data_sources = self
+        self.pages = _StubPages()
+
+    def query(self, data_source_id, start_cursor=None, page_size=100, **kwargs):
+        StubNotion.calls.hit("notion.data_sources.query", StubNotion.latency)
+        pages = StubNotion.pages_store
+        edited_since = (kwargs.get("filter") or {}).get("last_edited_time", {}).get("on_or_after")
+        if edited_since:
+            pages = [page for page in pages if page["last_edited_time"] >= edited_since]
+        if kwargs.get("sorts", [{}])[0].get("direction") == "descending":
+            pages = pages[::-1]
+        start = int(start_cursor or 0)
+        end = start + min(page_size, 100)
+        return {"results": [filtered(page, kwargs.get("filter_properties")) for page in pages[start:end]],
+                "has_more": end < len(pages),
+                "next_cursor": str(end) if end < len(pages) else None}
+
+    def retrieve(self, data_source_id, **kwargs):
+        StubNotion.calls.hit("notion.data_sources.retrieve", StubNotion.latency)
+        sample = StubNotion.pages_store[0]["properties"]
+        return {"properties": {name: {"id": name, "type": prop["type"]} for name, prop in sample.items()}}
+
+
+class _StubPages:
+    def retrieve(self, page_id, **kwargs):
+        StubNotion.calls.hit("notion.pages.retrieve", StubNotion.latency)
+        page = next(page for page in StubNotion.pages_store if page["id"] == page_id)
+        return filtered(page, kwargs.get("filter_properties"))
+
+    def update(self, page_id, properties=None, **kwargs):
+        StubNotion.calls.hit("notion.pages.update", StubNotion.latency)
+        return {"id": page_id}
+
+    def create(self, parent=None, properties=None, **kwargs):
+        StubNotion.calls.hit("notion.pages.create", StubNotion.latency)
+        return {"id": f"page-new-{time.monotonic_ns()}"}
+
+
+class StubSlack:
+    """Stand-in for slack_sdk.WebClient: every method succeeds after the configured latency."""
+
+    calls = None
+    latency = 0.0
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, method):
+        def call(**kwargs):
+            StubSlack.calls.hit(f"slack.{method}", StubSlack.latency)
+            return {"ok": True, "user": {"id": "U000"}, "channel": {"id": "D000"},
+                    "files": [{"id": "F000", "permalink": "https://slack.test/F000"}],
+                    "file": {"id": "F000", "permalink": "https://slack.test/F000"}}
+
+        return call
+
+
+def retained_session_memory(sessions):
+    """Traced bytes freed by clearing each session's state in turn, i.e. what that state kept alive.
+
+    Only meaningful while tracemalloc has been tracing since before the sessions ran. A
+    DataFrame still held by a shared cache is not freed, so it is not charged to any session;
+    one shared only between sessions is charged to the last of them to be cleared.
+    """
+    retained = []
+    for at in sessions:
+        gc.collect()
+        before = tracemalloc.get_traced_memory()[0]
+        for key in list(at.session_state.filtered_state):
+            del at.session_state[key]
+        gc.collect()
+        retained.append(max(before - tracemalloc.get_traced_memory()[0], 0))
+    return retained
+
+
+@contextlib.contextmanager
+def shared_runtime():
+    """Run AppTest sessions concurrently in one process, sharing caches like a real server.
+
+    AppTest swaps a mock Runtime, st.secrets and config options in and out around every
+    rerun, which races when sessions run on several threads. Install them once for the
+    whole load test instead, and point AppTest's per-run swaps at a throwaway subclass.
+    AppTest also compiles the script afresh on every rerun, and concurrent compiles fail
+    with "AST constructor recursion depth mismatch"; one shared script cache compiles it
+    once, as the server's does.
+    """
+    runtime = mock.MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+
+    secrets = Secrets()
+    secrets._secrets = SECRETS
+    script_cache = ScriptCache()
+
+    with contextlib.ExitStack() as stack:
+        store_dir = stack.enter_context(tempfile.TemporaryDirectory())
+        secrets._secrets = dict(SECRETS, TICKET_STORE_PATH=os.path.join(store_dir, "tickets.sqlite3"))
+        stack.enter_context(patch_config_options({"global.appTest": True}))
+        stack.enter_context(mock.patch.object(Runtime, "_instance", runtime))
+        stack.enter_context(mock.patch.object(app_test, "Runtime", type("SessionRuntime", (Runtime,), {})))
+        stack.enter_context(mock.patch.object(app_test, "patch_config_options",
+                                              lambda overrides: contextlib.nullcontext()))
+        stack.enter_context(mock.patch.object(st, "secrets", secrets))
+        stack.enter_context(mock.patch.object(app_test, "ScriptCache", lambda: script_cache))
+        stack.enter_context(mock.patch.object(local_script_runner, "ScriptCache", lambda: script_cache))
+        stack.enter_context(mock.patch.object(notion_client, "Client", StubNotion))
+        stack.enter_context(mock.patch.object(slack_sdk, "WebClient", StubSlack))
+        yield
+
+
+def new_session(admin, timeout):
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    at.session_state["authentication_status"] = True
+    at.session_state["name"] = "Load Test"
+    at.session_state["admin_authenticated"] = admin
+    return at
+
+
+def find(widgets, label):
+    """The widget with this label; a page that didn't render it raises LookupError."""
+    widget = next((widget for widget in widgets if widget.label == label), None)
+    if widget is None:
+        raise LookupError(f"no widget labelled {label!r}")
+    return widget
+
+
+def planned_steps(args):
+    """How many times each step should complete when every user gets through the scenario."""
+    admins = min(args.admins, args.users)
+    return {
+        "load": args.users,
+        "fetch": args.users,
+        "filter": args.users * args.filters,
+        "create": args.users * args.creates,
+        "edit": admins * args.edits,
+        "table_save": admins * args.table_saves,
+        "bulk_action": admins * args.bulk_actions,
+    }
+
+
+def run_user(user, args, timings, errors):
+    """Drive one simulated user through fetch, filter and create, plus edits and bulk edits for admins.
+
+    A step that raises, leaves an exception on the page or finds the page unrendered is
+    recorded under errors instead of being timed.
+    """
+    rng = random.Random(user)
+    admin = user < args.admins
+    at = new_session(admin, args.timeout)
+
+    def step(name, action):
+        start = time.perf_counter()
+        try:
+            action()
+        except Exception as e:
+            errors[name].append(repr(e))
+            return
+        elapsed = time.perf_counter() - start
+        if at.exception:
+            errors[name].extend(str(exc.value) for exc in at.exception)
+        elif not at.main:
+            errors[name].append("the page did not render")
+        else:
+            timings[name].append(elapsed)
+
+    def filter_month():
+        month = find(at.selectbox, "📅 Choose a month to filter tickets")
+        month.set_value(rng.choice(month.options)).run()
+
+    def create():
+        find(at.text_area, "Describe the issue").set_value(f"Load test ticket from user {user}")
+        find(at.button, "Submit").click().run()
+
+    def edit():
+        find(at.selectbox, "Update Status").set_value(rng.choice(["Open", "In Progress", "Closed"]))
+        find(at.text_area, "Comments").set_value(f"edited by load test user {user}")
+        find(at.button, "Update Ticket").click().run()
+
+    def table_save():
+        # AppTest can't type into a data_editor, so its edits are set as widget state, which
+        # has to be repeated on the rerun that clicks Save.
+        table = next((table for table in at.get("arrow_data_frame") if table.proto.id.endswith("-active_editor")),
+                     None)
+        if table is None:
+            raise LookupError("no active tickets table")
+        rows = rng.sample(range(len(table.value)), min(args.table_rows, len(table.value)))
+        edits = {"edited_rows": {str(row): {"Priority": rng.choice([priority for priority in ["High", "Medium", "Low"]
+                                                                     if priority != table.value["Priority"].iloc[row]])}
+                                 for row in rows},
+                 "added_rows": [], "deleted_rows": []}
+        at.session_state["active_editor"] = edits
+        at.run()
+        at.session_state["active_editor"] = edits
+        at.button(key="save_active").click().run()
+
+    def bulk_action():
+        at.selectbox(key="bulk_assigned").set_value(rng.choice(NAMES))
+        at.selectbox(key="bulk_action").set_value("Change Priority").run()
+        at.selectbox(key="bulk_new_priority").set_value(rng.choice(["High", "Medium", "Low"]))
+        at.button(key="bulk_apply").click().run()
+
+    step("load", at.run)
+    step("fetch", lambda: find(at.button, "🔄 Fetch Latest").click().run())
+    for _ in range(args.filters):
+        step("filter", filter_month)
+    for _ in range(args.creates):
+        step("create", create)
+
+    if admin:
+        for _ in range(args.edits):
+            step("edit", edit)
+        for _ in range(args.table_saves):
+            step("table_save", table_save)
+        for _ in range(args.bulk_actions):
+            step("bulk_action", bulk_action)
+
+    return at
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[pct - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test streamlit_app with simulated concurrent users.")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--admins", type=int, default=3, help="how many of the users edit tickets as admin")
+    parser.add_argument("--tickets", type=int, default=1000, help="size of the stubbed ticket data source")
+    parser.add_argument("--filters", type=int, default=3, help="month filter changes per user")
+    parser.add_argument("--creates", type=int, default=1, help="tickets created per user")
+    parser.add_argument("--edits", type=int, default=3, help="ticket updates per admin user")
+    parser.add_argument("--table-saves", type=int, default=1, help="active tickets table saves per admin user")
+    parser.add_argument("--table-rows", type=int, default=5, help="rows edited before each table save")
+    parser.add_argument("--bulk-actions", type=int, default=1, help="bulk priority changes per admin user")
+    parser.add_argument("--notion-latency", type=float, default=0.0, help="seconds added to each Notion call")
+    parser.add_argument("--slack-latency", type=float, default=0.0, help="seconds added to each Slack call")
+    parser.add_argument("--timeout", type=float, default=120, help="seconds allowed per rerun")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="also report peak traced process memory and the memory each session's state "
+                             "keeps alive (slows every rerun down)")
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+
+    sys.path.insert(0, APP_DIR)
+    rng = random.Random(0)
+    calls = BackendCalls()
+    StubNotion.pages_store = [fake_page(number, rng) for number in range(1, args.tickets + 1)]
+    StubNotion.calls = StubSlack.calls = calls
+    StubNotion.latency = args.notion_latency
+    StubSlack.latency = args.slack_latency
+
+    timings = defaultdict(list)
+    errors = defaultdict(list)
+    if args.trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+
+    with shared_runtime():
+        with ThreadPoolExecutor(max_workers=args.users) as pool:
+            sessions = list(pool.map(lambda user: run_user(user, args, timings, errors), range(args.users)))
+        # One idle rerun each, so memory is measured at rest rather than straight after a user's own write.
+        for at in sessions:
+            at.run()
+
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1] if args.trace_memory else 0
+    memory = retained_session_memory(sessions) if args.trace_memory else None
+    tracemalloc.stop()
+    planned = planned_steps(args)
+    completed = {name: len(timings.get(name, [])) for name in planned}
+    incomplete = {name: {"planned": count, "completed": completed[name]}
+                  for name, count in planned.items() if completed[name] != count}
+
+    report = {
+        "users": args.users,
+        "tickets": args.tickets,
+        "elapsed_s": round(elapsed, 2),
+        "reruns": {
+            name: {
+                "count": len(values),
+                "p50_ms": round(percentile(values, 50) * 1000, 1),
+                "p95_ms": round(percentile(values, 95) * 1000, 1),
+                "max_ms": round(max(values) * 1000, 1),
+            }
+            for name, values in timings.items()
+        },
+        "session_retained_mb": {
+            "mean": round(statistics.mean(memory) / 1024 / 1024, 2),
+            "max": round(max(memory) / 1024 / 1024, 2),
+        } if memory else None,
+        "process_peak_traced_mb": round(peak / 1024 / 1024, 1) if args.trace_memory else None,
+        "backend_calls": dict(sorted(calls.counts.items())),
+        "incomplete": incomplete,
+        "errors": {name: values[:5] for name, values in errors.items()},
+    }
+
+    print(f"👥 {args.users} users over {args.tickets} tickets in {report['elapsed_s']}s")
+    print(pd.DataFrame.from_dict(report["reruns"], orient="index").to_string())
+    if args.trace_memory:
+        print(f"\n🧠 Memory retained by each session's state: mean {report['session_retained_mb']['mean']} MB, "
+              f"max {report['session_retained_mb']['max']} MB")
+        print(f"🧠 Peak traced process memory: {report['process_peak_traced_mb']} MB")
+    print("\n📞 Backend calls:")
+    for name, count in report["backend_calls"].items():
+        print(f"  {name}: {count}")
+    for name, values in report["errors"].items():
+        print(f"❌ {name}: {len(errors[name])} error(s), e.g. {values[0]}")
+    for name, counts in incomplete.items():
+        print(f"❌ {name}: {counts['completed']} of {counts['planned']} step(s) completed")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if errors or incomplete:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
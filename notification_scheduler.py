@@ -0,0 +1,123 @@
+import atexit
+import threading
+import time
+from collections import Counter, defaultdict
+
+# Slack truncates message text at 40,000 characters; batches are split well below that.
+BATCH_TEXT_LIMIT = 35000
+BATCH_SEPARATOR = "\n\n──────────\n\n"
+
+
+class NotificationScheduler:
+    """Send urgent notifications straight away and coalesce the rest per recipient.
+
+    `deliver(user_id, text, urgent)` does the actual sending. Messages whose priority is
+    in `urgent_priorities` go out immediately on the urgent lane; everything else is
+    queued per recipient and flushed as one combined DM every `interval` seconds by a
+    background thread, so a burst of low-priority updates costs one message per person.
+    A message's `then` callback (e.g. sending its attachments) runs once it has been delivered.
+    """
+
+    def __init__(self, deliver, interval=300, urgent_priorities=("High",)):
+        self.deliver = deliver
+        self.interval = interval
+        self.urgent_priorities = set(urgent_priorities)
+        self.lock = threading.Lock()
+        self.pending = defaultdict(list)
+        self.stats = Counter()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="notification-batcher", daemon=True)
+        self.thread.start()
+        atexit.register(self.flush)
+
+    def submit(self, user_id, message, priority, then=None):
+        """Send now if the priority is urgent, otherwise queue for the next batch."""
+        if priority in self.urgent_priorities:
+            self.stats["sent_immediately"] += 1
+            self.deliver(user_id, message, True)
+            self._follow_up(then)
+            return
+
+        with self.lock:
+            self.pending[user_id].append((time.monotonic(), message, then))
+            self.stats["queued"] += 1
+
+    @staticmethod
+    def _follow_up(then):
+        if then is None:
+            return
+        try:
+            then()
+        except Exception as e:
+            print(f"❌ Error after sending a notification: {e}")
+
+    def flush(self):
+        """Send every queued message now, one combined DM per recipient.
+
+        If a delivery fails, that recipient's undelivered messages go back in the queue
+        for the next flush and the other recipients are still sent theirs.
+        """
+        with self.lock:
+            pending, self.pending = self.pending, defaultdict(list)
+
+        for user_id, queued in pending.items():
+            chunks = list(self._chunks(queued))
+            for i, chunk in enumerate(chunks):
+                try:
+                    self.deliver(user_id, self._combine([message for _, message, _ in chunk]), False)
+                except Exception as e:
+                    undelivered = [item for rest in chunks[i:] for item in rest]
+                    print(f"❌ Error sending batched notifications to {user_id}, "
+                          f"keeping {len(undelivered)} for the next batch: {e}")
+                    self._requeue(user_id, undelivered)
+                    self.stats["batches_failed"] += 1
+                    break
+                self.stats["batches_sent"] += 1
+                for _, _, then in chunk:
+                    self._follow_up(then)
+
+    def _requeue(self, user_id, queued):
+        """Put undelivered messages back ahead of any queued since, keeping their queue times."""
+        with self.lock:
+            self.pending[user_id][:0] = queued
+
+    def _chunks(self, queued):
+        """Split a recipient's queued messages into runs that fit in one DM."""
+        chunk = []
+        size = 0
+        for item in queued:
+            message = item[1]
+            if chunk and size + len(message) > BATCH_TEXT_LIMIT:
+                yield chunk
+                chunk, size = [], 0
+            chunk.append(item)
+            size += len(message) + len(BATCH_SEPARATOR)
+        if chunk:
+            yield chunk
+
+    def _combine(self, messages):
+        if len(messages) == 1:
+            return messages[0]
+        return f"🗂 *{len(messages)} ticket updates*" + BATCH_SEPARATOR + BATCH_SEPARATOR.join(messages)
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"❌ Error flushing batched notifications: {e}")
+
+    def snapshot(self):
+        """Queued message counts and the age of the oldest queued message."""
+        with self.lock:
+            now = time.monotonic()
+            queued = [queued_at for messages in self.pending.values() for queued_at, _, _ in messages]
+            return {
+                "recipients_waiting": len(self.pending),
+                "messages_waiting": len(queued),
+                "oldest_waiting_s": round(now - min(queued), 1) if queued else 0.0,
+                "sent_immediately": self.stats["sent_immediately"],
+                "queued_total": self.stats["queued"],
+                "batches_sent": self.stats["batches_sent"],
+                "batches_failed": self.stats["batches_failed"],
+            }
@@ -0,0 +1,156 @@
+import threading
+import time
+from collections import defaultdict
+
+# Requests per minute for the Slack methods the app calls, from Slack's published tiers.
+# chat.postMessage is "special" (about one message per second); files_upload_v2 makes
+# several tier 4 calls per file, so it is budgeted as a whole at tier 2.
+SLACK_BUDGETS = {
+    "chat.postMessage": 60,
+    "users.lookupByEmail": 50,
+    "conversations.open": 50,
+    "files.upload": 20,
+    "files.info": 100,
+}
+
+# Notion allows an average of three requests per second per integration, across all endpoints,
+# so every Notion call shares one budget.
+NOTION_BUDGETS = {
+    "notion": 180,
+}
+
+# Tokens per method that only urgent calls may spend, so they never queue behind bulk traffic.
+SLACK_RESERVED = {
+    "chat.postMessage": 3,
+}
+
+
+def retry_after_seconds(error):
+    """Seconds to back off for a rate-limited (429) API error, or None for any other error."""
+    response = getattr(error, "response", None)
+    status = getattr(error, "status", None) or getattr(response, "status_code", None)
+    if status != 429:
+        return None
+
+    headers = getattr(error, "headers", None) or getattr(response, "headers", None) or {}
+    value = headers.get("Retry-After") or headers.get("retry-after") or 1
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return 1.0
+
+
+class RateGovernor:
+    """Per-method token buckets shared by every thread that calls an API.
+
+    When a method's budget is spent, callers wait in line until tokens refill. A 429
+    pauses the whole method for the server's Retry-After before the call is retried.
+    `reserved` holds back a few tokens per method that only urgent calls may use.
+    Queue depth and wait times are kept per method for display.
+    """
+
+    def __init__(self, budgets, max_retries=3, burst_seconds=10, reserved=None):
+        self.condition = threading.Condition()
+        self.budgets = dict(budgets)
+        self.reserved = dict(reserved or {})
+        self.capacity = {method: max(1.0 + self.reserved.get(method, 0), limit * burst_seconds / 60)
+                         for method, limit in self.budgets.items()}
+        self.tokens = dict(self.capacity)
+        self.refilled_at = {method: time.monotonic() for method in self.budgets}
+        self.paused_until = {}
+        self.max_retries = max_retries
+        self.waiting = defaultdict(int)
+        self.stats = defaultdict(lambda: {"calls": 0, "queued": 0, "wait_seconds": 0.0, "max_wait": 0.0,
+                                          "rate_limited": 0, "retries": 0, "errors": 0})
+
+    def _refill(self, method, now):
+        elapsed = now - self.refilled_at[method]
+        self.refilled_at[method] = now
+        self.tokens[method] = min(self.capacity[method],
+                                  self.tokens[method] + elapsed * self.budgets[method] / 60)
+
+    def _seconds_until_ready(self, method, now, urgent):
+        """Zero if a call may go now (and takes its token), otherwise how long to wait."""
+        paused = self.paused_until.get(method, 0) - now
+        if paused > 0:
+            return paused
+        if method not in self.budgets:
+            return 0
+
+        self._refill(method, now)
+        needed = 1 if urgent else 1 + self.reserved.get(method, 0)
+        if self.tokens[method] >= needed:
+            self.tokens[method] -= 1
+            return 0
+        return (needed - self.tokens[method]) * 60 / self.budgets[method]
+
+    def acquire(self, method, urgent=False):
+        """Block until the method has budget, returning how long the caller waited."""
+        start = time.monotonic()
+        with self.condition:
+            self.waiting[method] += 1
+            try:
+                while True:
+                    delay = self._seconds_until_ready(method, time.monotonic(), urgent)
+                    if delay <= 0:
+                        break
+                    self.condition.wait(delay)
+            finally:
+                self.waiting[method] -= 1
+
+            waited = time.monotonic() - start
+            stats = self.stats[method]
+            stats["calls"] += 1
+            if waited > 0.001:
+                stats["queued"] += 1
+                stats["wait_seconds"] += waited
+                stats["max_wait"] = max(stats["max_wait"], waited)
+        return waited
+
+    def pause(self, method, seconds):
+        """Hold every caller of a method for the given number of seconds."""
+        with self.condition:
+            self.paused_until[method] = max(self.paused_until.get(method, 0), time.monotonic() + seconds)
+            self.stats[method]["rate_limited"] += 1
+            self.condition.notify_all()
+
+    def call(self, method, func, *args, urgent=False, **kwargs):
+        """Run an API call under the method's budget, retrying after 429 responses."""
+        for attempt in range(self.max_retries + 1):
+            self.acquire(method, urgent)
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                retry_after = retry_after_seconds(e)
+                if retry_after is None or attempt == self.max_retries:
+                    with self.condition:
+                        self.stats[method]["errors"] += 1
+                    raise
+                print(f"⏳ {method} rate limited, retrying in {retry_after:.0f}s")
+                self.pause(method, retry_after)
+                with self.condition:
+                    self.stats[method]["retries"] += 1
+
+    def reset_stats(self):
+        """Start the call counts and wait times over, e.g. for each cycle of a long-running process."""
+        with self.condition:
+            self.stats.clear()
+
+    def snapshot(self):
+        """Per-method queue depth, call counts and wait times."""
+        with self.condition:
+            now = time.monotonic()
+            return {
+                method: {
+                    "queue_depth": self.waiting[method],
+                    "calls": stats["calls"],
+                    "queued_calls": stats["queued"],
+                    "avg_wait_s": round(stats["wait_seconds"] / stats["queued"], 2) if stats["queued"] else 0.0,
+                    "max_wait_s": round(stats["max_wait"], 2),
+                    "rate_limited": stats["rate_limited"],
+                    "retries": stats["retries"],
+                    "errors": stats["errors"],
+                    "paused_for_s": round(max(self.paused_until.get(method, 0) - now, 0), 1),
+                }
+                for method, stats in self.stats.items()
+            }
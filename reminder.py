@@ -1,12 +1,25 @@
+import argparse
+import contextlib
+import datetime
+import hashlib
 import json
 import os
-from collections import defaultdict
+import sched
+import time
+import zoneinfo
+from collections import Counter, defaultdict
 
 import pandas as pd
 from notion_client import Client
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 
+from cache_warmer import parse_working_days
+from escalation import EscalationIndex
+from rate_governor import NOTION_BUDGETS, SLACK_BUDGETS, RateGovernor
+from snapshot import read_snapshot_tickets, write_snapshot
+from ticket_store import TicketStore
+
 bot = WebClient(token=os.environ['SLACK_BOT_TOKEN'])
 
 notion_token = os.environ['NOTION_TOKEN']
@@ -14,70 +27,186 @@ notion = Client(auth=notion_token)
 
 DATABASE_ID = os.environ['NOTION_DATABASE_ID']
 
-
-def fetch_tickets_from_notion():
-    """Fetch all tickets from Notion database with pagination."""
+# Every API call goes through these, which also count calls, waits and 429 retries for the run report.
+slack_governor = RateGovernor(SLACK_BUDGETS)
+notion_governor = RateGovernor(NOTION_BUDGETS)
+
+LEDGER_PATH = os.getenv("REMINDER_LEDGER_PATH", ".reminder_state/sent_ledger.jsonl")
+LEDGER_KEEP_DAYS = int(os.getenv("REMINDER_LEDGER_KEEP_DAYS", 7))
+TICKET_STORE_PATH = os.getenv("TICKET_STORE_PATH", ".reminder_state/tickets.sqlite3")
+
+# Hours a ticket may stay open per priority before it is overdue, e.g. '{"High": 8}'.
+SLA_HOURS = json.loads(os.getenv("SLA_HOURS") or "{}")
+ESCALATION_TOP_K = int(os.getenv("ESCALATION_TOP_K", 5))
+ESCALATION_INDEX_PATH = os.getenv("ESCALATION_INDEX_PATH", ".reminder_state/escalation_index.json")
+REPORT_PATH = os.getenv("REMINDER_REPORT_PATH", "reminder_report.json")
+# When set, every run also writes the static dashboard snapshot (snapshot.py) here from its synced mirror.
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR")
+
+# Daemon mode (--daemon) only. Times are "HH:MM" in REMINDER_TZ, per recipient name, "admin" for
+# the digest and "*" for everyone else, e.g. '{"*": "19:15", "Sara Malik": {"time": "10:00", "days": "0-5"}}'.
+REMINDER_SCHEDULE = json.loads(os.getenv("REMINDER_SCHEDULE") or "{}")
+DEFAULT_REMINDER_TIME = "19:15"
+REMINDER_WORKING_DAYS = os.getenv("REMINDER_WORKING_DAYS", "0-4")
+# The send ledger and run reports are dated in REMINDER_TZ in both modes.
+REMINDER_TZ = zoneinfo.ZoneInfo(os.getenv("REMINDER_TZ", "Asia/Karachi"))
+
+
+def reminder_date():
+    """Today's date in REMINDER_TZ, which keys the send ledger and the run reports."""
+    return datetime.datetime.now(REMINDER_TZ).date().isoformat()
+
+
+class RunReport:
+    """Machine-readable summary of one run: stage timings, API usage, deliveries and ticket counts.
+
+    Written as JSON at the end of every run, including failed ones, so the workflow can
+    keep it as an artifact and runs can be compared over time.
+    """
+
+    def __init__(self):
+        self.started_at = datetime.datetime.now(datetime.timezone.utc)
+        self.stages = defaultdict(float)
+        self.deliveries = defaultdict(Counter)
+        self.recipient_names = {}
+        self.tickets = {}
+        self.store_sync = {}
+        self.degraded = None
+        self.error = None
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Time a block of work; a stage entered several times accumulates."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] += time.perf_counter() - start
+
+    def record_delivery(self, recipient, outcome):
+        self.deliveries[recipient][outcome] += 1
+
+    def write(self, path, **extra):
+        finished_at = datetime.datetime.now(datetime.timezone.utc)
+        totals = Counter()
+        for outcomes in self.deliveries.values():
+            totals.update(outcomes)
+        report = {
+            "started_at": self.started_at.isoformat(),
+            "finished_at": finished_at.isoformat(),
+            "duration_s": round((finished_at - self.started_at).total_seconds(), 3),
+            "error": self.error,
+            "degraded": self.degraded,
+            "stages_s": {name: round(seconds, 3) for name, seconds in self.stages.items()},
+            "store_sync": self.store_sync,
+            "tickets": self.tickets,
+            "messages": dict(totals),
+            "recipients": {
+                recipient: dict(outcomes, name=self.recipient_names.get(recipient))
+                for recipient, outcomes in self.deliveries.items()
+            },
+            "api": {"slack": slack_governor.snapshot(), "notion": notion_governor.snapshot()},
+            **extra,
+        }
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, default=str)
+        print(f"📝 Run report written to {path}: {dict(totals)} in {report['duration_s']}s")
+
+
+report = RunReport()
+
+
+class SendLedger:
+    """Append-only record of delivered reminders so a rerun skips what already went out.
+
+    Entries are keyed by (run date, recipient, reminder kind, content hash) and flushed
+    to disk after every successful send, so a crash loses at most the in-flight message.
+    Slack user lookups for the day are recorded as well to avoid repeating them.
+    """
+
+    def __init__(self, path, run_date=None):
+        self.path = path
+        self.run_date = run_date or reminder_date()
+        self.sent = set()
+        self.user_ids = {}
+        self._load()
+
+    def _load(self):
+        """Read today's entries and drop the ones older than LEDGER_KEEP_DAYS."""
+        if not os.path.exists(self.path):
+            return
+
+        cutoff = (datetime.date.fromisoformat(self.run_date) - datetime.timedelta(days=LEDGER_KEEP_DAYS)).isoformat()
+        kept = []
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # partial line left behind by a crash mid-write
+                if entry.get("run_date", "") < cutoff:
+                    continue
+                kept.append(line if line.endswith("\n") else line + "\n")
+                if entry["run_date"] != self.run_date:
+                    continue
+                if entry.get("type") == "user":
+                    self.user_ids[entry["email"]] = entry["user_id"]
+                else:
+                    self.sent.add((entry["run_date"], entry["recipient"], entry["kind"], entry["hash"]))
+
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.writelines(kept)
+
+    def _append(self, entry):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def key(self, recipient, kind, message):
+        digest = hashlib.sha256(message.encode()).hexdigest()[:16]
+        return self.run_date, recipient, kind, digest
+
+    def was_sent(self, key):
+        return key in self.sent
+
+    def record_sent(self, key):
+        run_date, recipient, kind, digest = key
+        self._append({"type": "sent", "run_date": run_date, "recipient": recipient, "kind": kind, "hash": digest})
+        self.sent.add(key)
+
+    def record_user(self, email, user_id):
+        self._append({"type": "user", "run_date": self.run_date, "email": email, "user_id": user_id})
+        self.user_ids[email] = user_id
+
+
+def fetch_tickets_from_notion(store):
+    """Sync the local ticket mirror and read the Open and In Progress tickets from it.
+
+    When Notion can't be reached the run carries on from the mirror as last synced and
+    is marked degraded in the report.
+    """
+    try:
+        store.sync(notion, DATABASE_ID, governor=notion_governor)
+        store.load_text(notion, DATABASE_ID, governor=notion_governor)
+        report.store_sync = store.last_sync
+    except Exception as e:
+        print(f"⚠️ Error syncing tickets from Notion, using the local copy: {e}")
+        report.degraded = f"sync failed: {e}"
     try:
-        tickets = []
-        has_more = True
-        start_cursor = None
-        while has_more:
-            if start_cursor:
-                results = notion.data_sources.query(
-                    data_source_id=DATABASE_ID,
-                    start_cursor=start_cursor,
-                    sorts=[{"timestamp": "created_time", "direction": "descending"}]
-                )
-            else:
-                results = notion.data_sources.query(data_source_id=DATABASE_ID,
-                                                    sorts=[{"timestamp": "created_time", "direction": "descending"}])
-
-            for page in results["results"]:
-                props = page["properties"]
-
-                ticket_id = props["ID"]["title"][0]["text"]["content"] if props["ID"]["title"] else ""
-                if not ticket_id or "-" not in ticket_id:
-                    ticket_id = "TICKET-0001"
-
-                ticket = {
-                    "page_id": page["id"],
-                    "ID": ticket_id,
-                    "Issue": props["Issue"]["rich_text"][0]["text"]["content"] if props["Issue"]["rich_text"] else "",
-                    "Status": props["Status"]["select"]["name"] if props["Status"]["select"] else "Open",
-                    "Priority": props["Priority"]["select"]["name"] if props["Priority"]["select"] else "Medium",
-                    "Date Submitted": props["Date Submitted"]["date"]["start"] if props["Date Submitted"][
-                        "date"] else "",
-                    "Submitted Time": props["Submitted Time"]["rich_text"][0]["text"]["content"] if
-                    props["Submitted Time"]["rich_text"] else "",
-                    "Created By": props["Created By"]["select"]["name"] if props["Created By"]["select"][
-                        "name"] else "",
-                    "Assigned To": props["Assigned To"]["select"]["name"] if props["Assigned To"]["select"][
-                        "name"] else "",
-                    "Resolved Date": props["Resolved Date"]["date"]["start"] if props.get("Resolved Date") and
-                                                                                props["Resolved Date"][
-                                                                                    "date"] else None,
-                    "Resolved Time": props["Resolved Time"]["rich_text"][0]["text"]["content"] if
-                    props["Resolved Time"]["rich_text"] else "",
-                    "Comments": props["Comments"]["rich_text"][0]["text"]["content"] if props["Comments"][
-                        "rich_text"] else "",
-                    "Notify": props["Notify"]["rich_text"][0]["text"]["content"] if props["Notify"][
-                        "rich_text"] else "",
-                }
-                tickets.append(ticket)
-
-            has_more = results.get("has_more", False)
-            start_cursor = results.get("next_cursor", None)
-
-        df = pd.DataFrame(tickets)
-
-        if not df.empty:
-            if "Date Submitted" in df.columns:
-                df["Date Submitted"] = pd.to_datetime(df["Date Submitted"], format="%Y-%m-%d", errors='coerce')
-            if "Resolved Date" in df.columns:
-                df["Resolved Date"] = pd.to_datetime(df["Resolved Date"], format="%Y-%m-%d", errors='coerce')
-
-        df = df[df["Status"].isin(["Open", "In Progress"])]
+        return store.read(statuses=["Open", "In Progress"])
+    except Exception as e:
+        print(f"❌ Error reading the local ticket copy: {e}")
+        report.degraded = f"sync and local read failed: {e}"
+        return pd.DataFrame(columns=["page_id", "ID", "Issue", "Status", "Priority", "Date Submitted",
+                                     "Submitted Time", "Created By", "Assigned To", "Notify", "Category"])
+
 
+def bucket_tickets(df):
+    """Group live tickets per person into open, printing and personal reminders."""
+    try:
         name_list_assigned = df["Assigned To"].unique().tolist()
         name_list_created = df["Created By"].unique().tolist()
         combined = list(set(name_list_assigned + name_list_created))
@@ -91,14 +220,12 @@ def fetch_tickets_from_notion():
                 (df["Created By"] != df["Assigned To"])
                 ]
 
-            printed = tickets.copy()
-            tickets = tickets[~tickets["Issue"].str.contains("Printed|Complimentary|Proof",
-                                                             case=False, na=False)]
+            printed = tickets[tickets["Category"] == "Printing"]
+            tickets = tickets[tickets["Category"] != "Printing"]
             tickets = tickets[tickets["Notify"] == "Yes"]
             ticket_list[name].append(tickets["ID"].tolist())
             ticket_list[name].append(tickets["Issue"].astype(str).tolist())
 
-            printed = printed[printed["Issue"].str.contains("Printed|Complimentary|Proof", case=False, na=False)]
             printed_list[name].append(printed["ID"].tolist())
             printed_list[name].append(printed["Issue"].astype(str).tolist())
 
@@ -110,104 +237,432 @@ def fetch_tickets_from_notion():
         return combined, ticket_list, printed_list, personal_list
     except Exception as e:
         print(e)
-        return pd.DataFrame()
+        return [], {}, {}, {}
 
 
 def get_user_id_by_email(email):
     try:
-        response = bot.users_lookupByEmail(email=email)
+        response = slack_governor.call("users.lookupByEmail", bot.users_lookupByEmail, email=email)
         return response['user']['id']
     except SlackApiError as e:
         print(f"Error finding user: {e.response['error']} {email}")
         return None
 
 
-def send_dm(user_id, message):
+# Slack IDs this process has resolved; in daemon mode they are kept across days.
+user_directory = {}
+
+
+def lookup_user_id(ledger, email):
+    """Resolve a Slack ID, reusing one this process or today's ledger already has."""
+    if email in user_directory:
+        return user_directory[email]
+    if email in ledger.user_ids:
+        user_id = ledger.user_ids[email]
+    else:
+        user_id = get_user_id_by_email(email)
+        if user_id:
+            ledger.record_user(email, user_id)
+    if user_id:
+        user_directory[email] = user_id
+    return user_id
+
+
+def send_dm(user_id, message, blocks=None):
     try:
-        response = bot.chat_postMessage(
+        response = slack_governor.call(
+            "chat.postMessage",
+            bot.chat_postMessage,
             channel=user_id,
-            text=message
+            text=message,
+            blocks=blocks
         )
+        return True
     except SlackApiError as e:
         print(f"❌ Error sending message: {e.response['error']}")
-
-
-if __name__ == '__main__':
-
+        return False
+
+
+def send_once(ledger, user_id, kind, message, blocks=None):
+    """Send a DM unless the ledger shows the same message already went out today."""
+    content = message if blocks is None else json.dumps(blocks, sort_keys=True)
+    key = ledger.key(user_id, kind, content)
+    if ledger.was_sent(key):
+        print(f"⏭️ Skipping {kind} for {user_id}: already sent today")
+        report.record_delivery(user_id, "skipped")
+        return True
+
+    if send_dm(user_id, message, blocks):
+        ledger.record_sent(key)
+        report.record_delivery(user_id, "sent")
+        return True
+    report.record_delivery(user_id, "failed")
+    return False
+
+
+SECTION_TEXT_LIMIT = 3000
+MESSAGE_BLOCK_LIMIT = 50
+
+
+def ticket_lines(ticket_ids, issues):
+    return "\n\n\n".join([f"*{t}*: {i}" for t, i in zip(ticket_ids, issues)])
+
+
+def split_text(text, limit=SECTION_TEXT_LIMIT):
+    """Pieces of text of at most `limit` characters, broken at a line end or space where there is one."""
+    pieces = []
+    while len(text) > limit:
+        cut = text.rfind("\n", 0, limit)
+        if cut <= 0:
+            cut = text.rfind(" ", 0, limit)
+        if cut <= 0:
+            cut = limit
+        pieces.append(text[:cut])
+        text = text[cut:].lstrip("\n ")
+    pieces.append(text)
+    return pieces
+
+
+def section_blocks(text):
+    """Split mrkdwn text into section blocks that fit Slack's per-block text limit.
+
+    Tickets are packed whole where they fit; a single ticket longer than the limit
+    continues over as many blocks as it needs.
+    """
+    blocks = []
+    chunk = ""
+    parts = [piece for part in text.split("\n\n\n") for piece in split_text(part)]
+    for part in parts:
+        if chunk and len(chunk) + len(part) + 3 > SECTION_TEXT_LIMIT:
+            blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": chunk}})
+            chunk = part
+        else:
+            chunk = f"{chunk}\n\n\n{part}" if chunk else part
+    if chunk.strip():
+        blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": chunk}})
+    return blocks
+
+
+def compose_message(sections):
+    """Merge (header, body, footer) sections into one list of Block Kit blocks."""
+    blocks = []
+    for header, body, footer in sections:
+        if blocks:
+            blocks.append({"type": "divider"})
+        blocks.extend(section_blocks(header))
+        blocks.extend(section_blocks(body))
+        if footer:
+            blocks.append({"type": "context", "elements": [{"type": "mrkdwn", "text": footer}]})
+    return blocks
+
+
+def send_composed(ledger, user_id, kind, text, blocks):
+    """Send composed blocks, splitting into several messages only past Slack's block cap."""
+    chunks = [blocks[i:i + MESSAGE_BLOCK_LIMIT] for i in range(0, len(blocks), MESSAGE_BLOCK_LIMIT)]
+    sent = True
+    for part, chunk in enumerate(chunks):
+        chunk_kind = kind if part == 0 else f"{kind}:{part}"
+        sent = send_once(ledger, user_id, chunk_kind, text, chunk) and sent
+    return sent
+
+
+def with_issues(tickets, issues):
+    """Escalation index entries with their Issue text, which the index doesn't keep."""
+    return [dict(t, Issue=issues.get(t["page_id"], "")) for t in tickets]
+
+
+def overdue_lines(overdue, show_assignee=False):
+    lines = []
+    for t in overdue:
+        line = f"*{t['ID']}* ({t['Priority']}, {t['hours_over']:.0f}h over SLA): {t['Issue']}"
+        if show_assignee:
+            line += f" — _{t['Assigned To'] or 'Unassigned'}_"
+        lines.append(line)
+    return "\n\n\n".join(lines)
+
+
+def compose_reminder(id_, hexz_id, tickets, issues, personal_tickets, personal, printing_tickets, printing,
+                     overdue=None):
+    """Build one reminder for a person covering overdue, open, personal and printing tickets."""
+    sections = []
+    if overdue:
+        sections.append((
+            f":rotating_light: *Overdue for:* *<@{id_}>*\n\nThese tickets are past their SLA:",
+            overdue_lines(overdue),
+            ""
+        ))
+    if tickets:
+        sections.append((
+            f":bell: *Reminder for:* *<@{id_}>*\n\nHere are your open tickets:",
+            ticket_lines(tickets, issues),
+            f":bangbang: Please provide an update/reminder to *<@{hexz_id}>* or update it on the app when possible. 📝"
+        ))
+    if personal_tickets:
+        sections.append((
+            f":bell: *Personal Reminder for:* *<@{id_}>*\n\nHere are your personal tickets reminders:",
+            ticket_lines(personal_tickets, personal),
+            ""
+        ))
+    if printing_tickets:
+        sections.append((
+            f":printer: *Printing Reminder for:* *<@{id_}>*\n\nHere are your pending printed copy/ies tickets:",
+            ticket_lines(printing_tickets, printing),
+            f":bangbang: Please remind *<@{hexz_id}>* if urgent or leave a comment on the app.📝"
+        ))
+    return compose_message(sections)
+
+
+def change_counts(events):
+    """What logged ticket changes add up to: tickets created, closed, reopened, reassigned and re-prioritised."""
+    status = events[events["field"] == "Status"]
+    return {
+        "new": int((events["field"] == "created").sum()),
+        "closed": int((status["new_value"] == "Closed").sum()),
+        "reopened": int(((status["old_value"] == "Closed") & (status["new_value"] != "Closed")).sum()),
+        "reassigned": int((events["field"] == "Assigned To").sum()),
+        "reprioritised": int((events["field"] == "Priority").sum()),
+    }
+
+
+def changes_since_last_run(store, run_date):
+    """Change counts since the last run that sent the admin digest, or None on the first run.
+
+    The starting point is pinned per run date, so a retry later the same day reports the
+    same window and the ledger can still tell the digest was already sent.
+    """
+    day_cursor = f"reminder:{run_date}"
+    start = store.cursor(day_cursor)
+    if start is None:
+        start = store.cursor("reminder")
+        if start is None:
+            return None
+        store.set_cursor(day_cursor, start)
+    return change_counts(store.events(after_id=start))
+
+
+def compose_admin_digest(hexz_id, notified, printed_tickets, printings, escalations=None, changes=None):
+    """Build the single admin message: recent changes, SLA breaches, who was notified, pending prints and the nudge."""
+    sections = []
+    if changes and any(changes.values()):
+        sections.append((
+            "📈 *Since the last reminder:*",
+            " · ".join(f"{count} {label}" for label, count in changes.items() if count),
+            ""
+        ))
+    if escalations:
+        sections.append((
+            f"🚨 *SLA breaches ({len(escalations)}):*",
+            overdue_lines(escalations, show_assignee=True),
+            ""
+        ))
+    if notified:
+        sections.append((
+            f"🚀 *Notifications sent ({len(notified)}):*",
+            "\n".join(f"• *<@{user_id}>*" for user_id in notified),
+            ""
+        ))
+    if printed_tickets:
+        sections.append((
+            f":printer: *Printing Reminder for:* *<@{hexz_id}>*\n\nPending Prints ({len(printed_tickets)}):",
+            ticket_lines(printed_tickets, printings),
+            ""
+        ))
+    sections.append((":bell: Reminder: Check your open tickets!", "", ""))
+    return compose_message(sections)
+
+
+def bucket_counts(buckets):
+    """Tickets listed per bucket, summed over people, and how many people have any."""
+    return {"tickets": sum(len(ids) for ids, _ in buckets.values()),
+            "people": sum(1 for ids, _ in buckets.values() if ids)}
+
+
+def run_cycle(store, index, ledger, recipients=None, digest=True, notified=None):
+    """Send reminders to `recipients` (everyone when None) and, if `digest`, the admin digest.
+
+    `notified` lists who was already notified today, for the digest. Returns it with the
+    people this cycle notified added.
+    """
     names = os.getenv("NAMES")
     names = json.loads(names)
-    name_list, ticket_dict, printed_dict, personal_dict = fetch_tickets_from_notion()
-    hexz_id = get_user_id_by_email(os.getenv("ADMIN_EMAIL"))
+    notified = list(notified or [])
+    with report.stage("fetch"):
+        live_df = fetch_tickets_from_notion(store)
+        changes = changes_since_last_run(store, ledger.run_date) if digest else None
+    if SNAPSHOT_DIR:
+        with report.stage("snapshot"):
+            try:
+                write_snapshot(read_snapshot_tickets(store), SNAPSHOT_DIR)
+            except Exception as e:
+                print(f"❌ Error writing dashboard snapshot: {e}")
+    with report.stage("bucketing"):
+        name_list, ticket_dict, printed_dict, personal_dict = bucket_tickets(live_df)
+    with report.stage("lookup"):
+        hexz_id = lookup_user_id(ledger, os.getenv("ADMIN_EMAIL"))
+    report.recipient_names[hexz_id] = "admin"
+
+    # Only tickets added, closed or re-prioritised since the last run are re-keyed. A failed
+    # sync or an empty read would otherwise drop every open ticket and its escalation state.
+    index_current = not report.degraded and not (live_df.empty and index.tickets)
+    if index_current:
+        with report.stage("escalation"):
+            index.sync(live_df)
+    else:
+        print("⚠️ Ticket list is incomplete, keeping the escalation index as last saved")
+    now = time.time()
+    issue_text = dict(zip(live_df["page_id"], live_df["Issue"].fillna("").astype(str)))
+
+    report.tickets.update({
+        "live": len(live_df),
+        "open": bucket_counts(ticket_dict),
+        "printing": bucket_counts(printed_dict),
+        "personal": bucket_counts(personal_dict),
+    })
+    overdue_count = 0
 
     for name in name_list:
-        tickets_exists: bool = False
-        personal_exists: bool = False
-        printing_exists: bool = False
-        if name not in ticket_dict:
+        if name not in ticket_dict or (recipients is not None and name not in recipients):
             continue
 
         tickets, issues = ticket_dict.get(name, ([], [])) if name != "Huzaifa Sabah Uddin" else ([], [])
         tickets_3, personal = personal_dict.get(name, ([], []))
         tickets_printing, printing = printed_dict.get(name, ([], [])) if name != "Huzaifa Sabah Uddin" else ([], [])
-        id_ = get_user_id_by_email(names.get(name))
-
-        if tickets:
-            ticket_lines = "\n\n\n".join([f"*{t}*: {i}" for t, i in zip(tickets, issues)])
-            tickets_exists = True
-        else:
-            ticket_lines = ""
+        overdue = index.overdue(name, now, ESCALATION_TOP_K) if name != "Huzaifa Sabah Uddin" else []
+        overdue = with_issues(overdue, issue_text)
+        overdue_count += len(overdue)
 
-        if tickets_3:
-            personal_lines = "\n\n\n".join([f"*{t}*: {i}" for t, i in zip(tickets_3, personal)])
-            personal_exists = True
-        else:
-            personal_lines = ""
+        if not (tickets or tickets_3 or tickets_printing or overdue):
+            continue
 
-        if tickets_printing:
-            printing_lines = "\n\n\n".join([f"*{t}*: {i}" for t, i in zip(tickets_printing, printing)])
-            printing_exists = True
-        else:
-            printing_lines = ""
-
-
-        if tickets_exists:
-            message = (
-                f":bell: *Reminder for:* *<@{id_}>*\n\n"
-                f"Here are your open tickets:\n\n"
-                f"{ticket_lines}\n\n"
-                f":bangbang: Please provide an update/reminder to *<@{hexz_id}>* or update it on the app when possible. 📝"
-            )
-            send_dm(id_, message)
-
-        if tickets_exists:
-            send_dm(hexz_id, f"🚀 Notification sent to *<@{id_}>*!")
-
-        if personal_exists:
-            message = (
-                f":bell: *Personal Reminder for:* *<@{id_}>*\n\n"
-                f"Here are your personal tickets reminders:\n\n"
-                f"{personal_lines}\n\n"
-            )
-            send_dm(id_, message)
-
-        if printing_exists:
-            message = (
-                f":printer: *Printing Reminder for:* *<@{id_}>*\n\n"
-                f"Here are your pending printed copy/ies tickets:\n\n"
-                f"{printing_lines}\n\n"
-                f":bangbang: Please remind *<@{hexz_id}>* if urgent or leave a comment on the app.📝"
-            )
-            send_dm(id_, message)
-
-    tickets_2, printings = printed_dict.get("Huzaifa Sabah Uddin", ([], []))
-    if tickets_2:
-        printed_lines = "\n\n\n".join([f"*{t}*: {i}" for t, i in zip(tickets_2, printings)])
-        message = (
-            f":printer: *Printing Reminder for:* *<@{hexz_id}>*\n\n"
-            f"Pending Prints ({len(tickets_2)}):\n\n"
-            f"{printed_lines}\n\n"
+        with report.stage("lookup"):
+            id_ = lookup_user_id(ledger, names.get(name))
+        report.recipient_names[id_] = name
+        blocks = compose_reminder(id_, hexz_id, tickets, issues, tickets_3, personal, tickets_printing, printing,
+                                  overdue)
+        with report.stage("send"):
+            sent = send_composed(ledger, id_, "reminder", f":bell: Ticket reminders for {name}", blocks)
+
+        if sent and tickets and id_ not in notified:
+            notified.append(id_)
+    report.tickets["overdue_listed"] = overdue_count
+
+    if digest:
+        tickets_2, printings = printed_dict.get("Huzaifa Sabah Uddin", ([], []))
+        escalations = with_issues(index.escalations(now, ledger.run_date), issue_text)
+        report.tickets.update({"escalations": len(escalations), "changes_since_last_run": changes})
+        digest_blocks = compose_admin_digest(hexz_id, notified, tickets_2, printings, escalations, changes)
+        with report.stage("send"):
+            digest_sent = send_composed(ledger, hexz_id, "admin_digest", ":bell: Reminder: Check your open tickets!",
+                                        digest_blocks)
+        if digest_sent:
+            index.mark_escalated(escalations, ledger.run_date)
+            store.set_cursor("reminder")
+    if index_current:
+        index.save(ESCALATION_INDEX_PATH)
+    return notified
+
+
+def main():
+    ledger = SendLedger(LEDGER_PATH)
+    store = TicketStore(TICKET_STORE_PATH)
+    index = EscalationIndex.load(ESCALATION_INDEX_PATH, SLA_HOURS)
+    run_cycle(store, index, ledger)
+
+
+def recipient_schedule(names):
+    """Group recipients, plus "admin" for the digest, by (hour, minute, working days) from REMINDER_SCHEDULE."""
+    default = REMINDER_SCHEDULE.get("*", DEFAULT_REMINDER_TIME)
+    groups = defaultdict(list)
+    for name in list(names) + ["admin"]:
+        entry = REMINDER_SCHEDULE.get(name, default)
+        if isinstance(entry, str):
+            entry = {"time": entry}
+        hour, minute = map(int, entry.get("time", DEFAULT_REMINDER_TIME).split(":"))
+        days = frozenset(parse_working_days(entry.get("days", REMINDER_WORKING_DAYS)))
+        groups[(hour, minute, days)].append(name)
+    return groups
+
+
+def next_run(hour, minute, days, now):
+    """The first hour:minute on one of `days` (Monday is 0) after `now`, or None if there are no days."""
+    if not days:
+        return None
+    candidate = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if candidate <= now:
+        candidate += datetime.timedelta(days=1)
+    while candidate.weekday() not in days:
+        candidate += datetime.timedelta(days=1)
+    return candidate
+
+
+class ReminderDaemon:
+    """Long-running reminder that sends each recipient's reminders at their own time and working days.
+
+    Cycles are queued on an in-process scheduler. The Notion and Slack clients, the ticket
+    mirror, the escalation index and resolved Slack IDs stay loaded between cycles, so a
+    cycle costs an incremental sync plus the messages it sends. Each cycle writes its own
+    run report to REPORT_PATH.
+    """
+
+    def __init__(self, names):
+        self.store = TicketStore(TICKET_STORE_PATH)
+        self.index = EscalationIndex.load(ESCALATION_INDEX_PATH, SLA_HOURS)
+        self.ledger = None
+        self.notified = []
+        self.groups = recipient_schedule(names)
+        self.scheduler = sched.scheduler(time.time, time.sleep)
+
+    def current_ledger(self):
+        """Today's send ledger, started afresh when the date in REMINDER_TZ changes."""
+        today = reminder_date()
+        if self.ledger is None or self.ledger.run_date != today:
+            self.ledger = SendLedger(LEDGER_PATH, today)
+            self.notified = []
+        return self.ledger
+
+    def schedule(self, when, recipients):
+        hour, minute, days = when
+        at = next_run(hour, minute, days, datetime.datetime.now(REMINDER_TZ))
+        if at is None:
+            print(f"⚠️ No working days scheduled for {', '.join(recipients)}")
+            return
+        self.scheduler.enterabs(at.timestamp(), 1, self.run, (when, recipients))
+        print(f"⏰ Next reminders for {', '.join(recipients)} at {at:%a %Y-%m-%d %H:%M}")
+
+    def run(self, when, recipients):
+        global report
+        report = RunReport()
+        slack_governor.reset_stats()
+        notion_governor.reset_stats()
+        try:
+            ledger = self.current_ledger()
+            self.notified = run_cycle(self.store, self.index, ledger, recipients=set(recipients) - {"admin"},
+                                      digest="admin" in recipients, notified=self.notified)
+        except Exception as e:
+            report.error = repr(e)
+            print(f"❌ Reminder cycle failed: {e}")
+        finally:
+            report.write(REPORT_PATH, run_date=reminder_date(), cycle=sorted(recipients))
+            self.schedule(when, recipients)
+
+    def run_forever(self):
+        for when, recipients in self.groups.items():
+            self.schedule(when, recipients)
+        self.scheduler.run()
 
-        )
-        send_dm(hexz_id, message)
 
-    send_dm(hexz_id, ":bell: Reminder: Check your open tickets!")
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Send the ticket reminders and the admin digest.")
+    parser.add_argument("--daemon", action="store_true",
+                        help="keep running and send reminders at the times in REMINDER_SCHEDULE")
+    args = parser.parse_args()
+    if args.daemon:
+        ReminderDaemon(json.loads(os.getenv("NAMES"))).run_forever()
+    else:
+        try:
+            main()
+        except BaseException as e:
+            report.error = repr(e)
+            raise
+        finally:
+            report.write(REPORT_PATH, run_date=reminder_date())
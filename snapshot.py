@@ -0,0 +1,183 @@
+"""Render the dashboard's counts and ticket tables into a static, read-only HTML/JSON bundle.
+
+Reads the local ticket mirror, so viewers get instant pages without a Streamlit session
+or a Notion call; the live app is only needed to create and edit tickets. Issue and
+Comments hold client names, phone numbers and addresses, so they are left out.
+
+    python snapshot.py --out snapshot [--no-sync] [--every 600]
+"""
+import argparse
+import datetime
+import html
+import json
+import os
+import time
+import zoneinfo
+
+import pandas as pd
+
+from archive import archive_cutoff
+from ticket_schema import TICKET_COLUMNS
+from ticket_store import TICKET_STORE_PATH, TicketStore
+
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "snapshot")
+SNAPSHOT_TZ = zoneinfo.ZoneInfo(os.getenv("SNAPSHOT_TZ", "Asia/Karachi"))
+
+ACTIVE_STATUSES = ["Open", "In Progress"]
+# The dashboard's active and closed table columns, minus the free text that carries client details.
+PRIVATE_COLUMNS = ["Issue", "Comments"]
+CLOSED_COLUMNS = [column for column in TICKET_COLUMNS + ["Category"] if column not in PRIVATE_COLUMNS]
+ACTIVE_COLUMNS = [column for column in CLOSED_COLUMNS if column != "Resolved Time"]
+
+PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>Support tickets — {title}</title>
+<style>
+body {{ font-family: sans-serif; margin: 2rem auto; max-width: 1200px; padding: 0 1rem; color: #262730; }}
+nav a {{ margin-right: .75rem; }}
+nav a.current {{ font-weight: bold; text-decoration: none; color: inherit; }}
+.metrics {{ display: flex; flex-wrap: wrap; gap: 2rem; margin: 1rem 0; }}
+.metric span {{ display: block; font-size: .85rem; color: #555; }}
+.metric b {{ font-size: 1.8rem; }}
+table {{ border-collapse: collapse; width: 100%; font-size: .85rem; }}
+th, td {{ border: 1px solid #ddd; padding: .3rem .5rem; text-align: left; vertical-align: top; }}
+th {{ background: #f0f2f6; }}
+td {{ white-space: pre-wrap; }}
+</style>
+</head>
+<body>
+<h1>🎫 Support tickets</h1>
+<p>Read-only snapshot generated {generated_at}. Open the app to create or edit tickets.</p>
+<nav>{nav}</nav>
+{body}
+</body>
+</html>
+"""
+
+
+def month_file(month):
+    return "index.html" if month == "All" else f"{month.lower()}.html"
+
+
+def metric(label, value):
+    return f'<div class="metric"><span>{html.escape(label)}</span><b>{value:,}</b></div>'
+
+
+def ticket_table(df, columns):
+    if df.empty:
+        return "<p>No tickets.</p>"
+    table = df[[column for column in columns if column in df.columns]].copy()
+    for column in ("Date Submitted", "Resolved Date"):
+        if column in table.columns:
+            table[column] = table[column].dt.strftime("%Y-%m-%d")
+    return table.fillna("").to_html(index=False, border=0)
+
+
+def build_snapshot(df, generated_at):
+    """Per-month metrics and the active and closed tables, as the dashboard shows them.
+
+    Returns the JSON-ready summary and {file name: HTML} for one page per month plus "All".
+    """
+    df = df.assign(Month=df["Date Submitted"].dt.strftime("%B"))
+    normal = df["Ticket Type"] == "Normal"
+    personal = df["Ticket Type"] == "Personal"
+    active = df["Status"].isin(ACTIVE_STATUSES)
+    closed = df["Status"] == "Closed"
+    pending_prints = int((active & (df["Category"] == "Printing")).sum()) if "Category" in df.columns else 0
+
+    months = ["All"] + sorted(month for month in df["Month"].dropna().unique())
+    summary = {"generated_at": generated_at.isoformat(), "tickets": len(df), "pending_prints": pending_prints,
+               "months": {}}
+    pages = {}
+    for month in months:
+        in_month = df["Month"] == month if month != "All" else pd.Series(True, index=df.index)
+        counts = {
+            "normal": int((in_month & normal).sum()),
+            "personal": int((in_month & personal).sum()),
+            "active": int((in_month & normal & active).sum()),
+            "active_personal": int((in_month & personal & active).sum()),
+            "closed": int((in_month & normal & closed).sum()),
+            "closed_personal": int((in_month & personal & closed).sum()),
+        }
+        summary["months"][month] = counts
+
+        suffix = "" if month == "All" else f" this month ({month})"
+        nav = " ".join(f'<a href="{month_file(other)}"{" class=current" if other == month else ""}>'
+                       f'{html.escape(other)}</a>' for other in months)
+        body = "\n".join([
+            f'<div class="metrics">{metric("Print orders waiting", pending_prints)}</div>',
+            f"<h2>📊 Showing tickets for: {html.escape(month)}</h2>",
+            '<div class="metrics">' + metric("Total Normal Tickets Found", counts["normal"])
+            + metric("Total Personal Tickets Found", counts["personal"]) + "</div>",
+            "<h2>🟢 Active Tickets</h2>",
+            '<div class="metrics">' + metric(f"Number of active tickets{suffix}", counts["active"])
+            + metric("Number of active personal tickets", counts["active_personal"]) + "</div>",
+            ticket_table(df[in_month & normal & active], ACTIVE_COLUMNS),
+            "<h2>📦 Closed Tickets</h2>",
+            '<div class="metrics">' + metric(f"Number of closed tickets{suffix}", counts["closed"])
+            + metric("Number of closed personal tickets", counts["closed_personal"]) + "</div>",
+            "<details><summary>View Closed Tickets</summary>",
+            ticket_table(df[in_month & normal & closed], CLOSED_COLUMNS),
+            "</details>",
+        ])
+        pages[month_file(month)] = PAGE.format(title=html.escape(month), nav=nav, body=body,
+                                               generated_at=f"{generated_at:%Y-%m-%d %I:%M %p %Z}")
+    return summary, pages
+
+
+def write_snapshot(df, out_dir=SNAPSHOT_DIR, generated_at=None):
+    """Write snapshot.json and the HTML pages to out_dir, each replaced atomically. Returns the summary."""
+    generated_at = generated_at or datetime.datetime.now(SNAPSHOT_TZ)
+    summary, pages = build_snapshot(df, generated_at)
+    files = dict(pages)
+    files["snapshot.json"] = json.dumps(summary, indent=2)
+
+    os.makedirs(out_dir, exist_ok=True)
+    for name, content in files.items():
+        path = os.path.join(out_dir, name)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(path + ".tmp", path)
+    for name in os.listdir(out_dir):
+        if name.endswith(".html") and name not in files:
+            os.remove(os.path.join(out_dir, name))  # a month that no longer has tickets
+    print(f"🖼️ Snapshot of {summary['tickets']:,} ticket(s) written to {out_dir} ({len(pages)} page(s))")
+    return summary
+
+
+def read_snapshot_tickets(store):
+    """Tickets the dashboard shows: all of them, minus old closed ones once ARCHIVE_AFTER_DAYS is set."""
+    hot_since = None
+    if os.getenv("ARCHIVE_AFTER_DAYS"):
+        hot_since = archive_cutoff(int(os.getenv("ARCHIVE_AFTER_DAYS")))
+    return store.read(hot_since=hot_since)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a static read-only snapshot of the ticket dashboard.")
+    parser.add_argument("--out", default=SNAPSHOT_DIR)
+    parser.add_argument("--store", default=TICKET_STORE_PATH, help="path of the local ticket mirror")
+    parser.add_argument("--no-sync", action="store_true", help="render the mirror as it is, without calling Notion")
+    parser.add_argument("--every", type=float, help="keep running and write a snapshot every this many seconds")
+    args = parser.parse_args()
+
+    store = TicketStore(args.store)
+    notion = data_source_id = None
+    if not args.no_sync:
+        from notion_client import Client
+
+        notion = Client(auth=os.environ["NOTION_TOKEN"])
+        data_source_id = os.getenv("NOTION_DATASOURCE_ID") or os.environ["NOTION_DATABASE_ID"]
+    while True:
+        try:
+            if notion:
+                store.sync(notion, data_source_id)
+                store.load_text(notion, data_source_id)
+            write_snapshot(read_snapshot_tickets(store), args.out)
+        except Exception as e:
+            print(f"❌ Error writing snapshot: {e}")
+        if not args.every:
+            break
+        time.sleep(args.every)
@@ -1,10 +1,20 @@
+import cProfile
 import datetime
+import glob
 import hashlib
+import json
 import os
+import pickle
+import pstats
+import threading
 import time
+import uuid
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import timedelta
 
 import extra_streamlit_components as stx
+import numpy as np
 import pandas as pd
 import pytz
 import streamlit as st
@@ -12,6 +22,19 @@ from notion_client import Client
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 
+from archive import (archive_cutoff, archived_month_names, partition_key, partition_month_name, query_pages,
+                     read_archive)
+from cache_warmer import CacheWarmer, parse_working_days, parse_working_hours
+from notification_scheduler import NotificationScheduler
+from rate_governor import NOTION_BUDGETS, SLACK_BUDGETS, SLACK_RESERVED, RateGovernor
+from ticket_schema import (PRIORITIES, STATUSES, TICKET_COLUMNS, classify_ticket, columns_frame, decode_pages,
+                           parse_ticket_page, rich_text, ticket_properties)
+from ticket_store import TicketStore
+
+# Slices, column drops and shallow copies share memory with the frame they came from until
+# one of them is written to, so per-session views of the shared ticket frame cost next to nothing.
+pd.options.mode.copy_on_write = True
+
 
 def setup_page():
     """Configure Streamlit page settings"""
@@ -142,6 +165,23 @@ def get_notion_client():
 DATABASE_ID = os.getenv("NOTION_DATABASE_ID") or st.secrets.get("NOTION_DATABASE_ID", "")
 DATASOURCE_ID = os.getenv("NOTION_DATASOURCE_ID") or st.secrets.get("NOTION_DATASOURCE_ID", "")
 ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD") or st.secrets.get("ADMIN_PASSWORD", "")
+NOTIFY_BATCH_SECONDS = int(os.getenv("NOTIFY_BATCH_SECONDS") or st.secrets.get("NOTIFY_BATCH_SECONDS", 300))
+PROFILE_RERUNS = str(os.getenv("PROFILE_RERUNS") or st.secrets.get("PROFILE_RERUNS", "")).lower() in ("1", "true", "yes")
+PROFILE_DIR = os.getenv("PROFILE_DIR") or st.secrets.get("PROFILE_DIR", "profiles")
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP") or st.secrets.get("PROFILE_KEEP", 200))
+ATTACHMENT_REGISTRY_PATH = (os.getenv("ATTACHMENT_REGISTRY_PATH")
+                            or st.secrets.get("ATTACHMENT_REGISTRY_PATH", ".slack_attachments.json"))
+ARCHIVE_AFTER_DAYS = os.getenv("ARCHIVE_AFTER_DAYS") or st.secrets.get("ARCHIVE_AFTER_DAYS", "")
+ARCHIVE_DIR = os.getenv("TICKET_ARCHIVE_DIR") or st.secrets.get("TICKET_ARCHIVE_DIR", "archive")
+ARCHIVE_DATASOURCE_ID = os.getenv("ARCHIVE_DATASOURCE_ID") or st.secrets.get("ARCHIVE_DATASOURCE_ID", "")
+TICKET_STORE_PATH = os.getenv("TICKET_STORE_PATH") or st.secrets.get("TICKET_STORE_PATH", ".ticket_store.sqlite3")
+SHARED_FRAME_MAX_AGE = int(os.getenv("SHARED_FRAME_MAX_AGE") or st.secrets.get("SHARED_FRAME_MAX_AGE", 60))
+SESSION_MEMORY_BUDGET_MB = float(os.getenv("SESSION_MEMORY_BUDGET_MB")
+                                 or st.secrets.get("SESSION_MEMORY_BUDGET_MB", 5))
+CACHE_WARM_INTERVAL = int(os.getenv("CACHE_WARM_INTERVAL") or st.secrets.get("CACHE_WARM_INTERVAL", 600))
+CACHE_WARM_BUSY_INTERVAL = int(os.getenv("CACHE_WARM_BUSY_INTERVAL") or st.secrets.get("CACHE_WARM_BUSY_INTERVAL", 60))
+WORKING_HOURS = parse_working_hours(os.getenv("WORKING_HOURS") or st.secrets.get("WORKING_HOURS", "9-18"))
+WORKING_DAYS = parse_working_days(os.getenv("WORKING_DAYS") or st.secrets.get("WORKING_DAYS", "0-4"))
 
 if not DATABASE_ID:
     st.error("Please set NOTION_DATABASE_ID in your environment or Streamlit secrets.")
@@ -164,18 +204,32 @@ if not DATABASE_ID:
 notion = get_notion_client()
 
 
+@st.cache_resource
+def get_slack_governor():
+    """One rate governor for every session and thread in this server process."""
+    return RateGovernor(SLACK_BUDGETS, reserved=SLACK_RESERVED)
+
+
+def slack_call(method, func, urgent=False, **kwargs):
+    """Call a Slack Web API method through the shared rate governor."""
+    return get_slack_governor().call(method, func, urgent=urgent, **kwargs)
+
+
 def get_user_id_by_email(email):
     try:
-        response = client.users_lookupByEmail(email=email)
+        response = slack_call("users.lookupByEmail", client.users_lookupByEmail, email=email)
         return response['user']['id']
     except SlackApiError as e:
         print(f"Error finding user: {e.response['error']}")
         return None
 
 
-def send_dm(user_id, message):
+def send_dm(user_id, message, urgent=False):
     try:
-        response = client.chat_postMessage(
+        response = slack_call(
+            "chat.postMessage",
+            client.chat_postMessage,
+            urgent=urgent,
             channel=user_id,
             text=message
         )
@@ -183,26 +237,120 @@ def send_dm(user_id, message):
         print(f"❌ Error sending message: {e.response['error']}")
 
 
+@st.cache_resource
+def get_notification_scheduler():
+    """One scheduler per server process: High priority goes now, the rest is batched."""
+    return NotificationScheduler(send_dm, interval=NOTIFY_BATCH_SECONDS)
+
+
+def notify(user_id, message, priority, then=None):
+    """Queue a ticket notification according to the ticket's priority; `then` runs once it is sent."""
+    get_notification_scheduler().submit(user_id, message, priority, then)
+
+
+class AttachmentRegistry:
+    """Remember Slack uploads by content hash so repeat attachments are shared by link.
+
+    A file uploaded to a DM is only visible to that DM's members, so reuse is
+    tracked per channel: the same bytes sent to the same person again are linked
+    to the earlier upload instead of being uploaded a second time.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries = {}
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"⚠️ Could not read attachment registry {path}: {e}")
+
+    def lookup(self, digest, channel_id):
+        """Return the earlier upload of these bytes to this channel, if any."""
+        with self.lock:
+            upload = self.entries.get(digest, {}).get("channels", {}).get(channel_id)
+            return dict(upload) if upload else None
+
+    def record(self, digest, channel_id, name, file_id, permalink=None):
+        with self.lock:
+            entry = self.entries.setdefault(digest, {"name": name, "channels": {}})
+            entry["channels"][channel_id] = {"file_id": file_id, "permalink": permalink}
+            self._save()
+
+    def forget(self, digest, channel_id):
+        """Drop an earlier upload that can no longer be linked, e.g. because it was deleted."""
+        with self.lock:
+            channels = self.entries.get(digest, {}).get("channels", {})
+            if channels.pop(channel_id, None) is not None:
+                if not channels:
+                    del self.entries[digest]
+                self._save()
+
+    def _save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.path)
+
+
+@st.cache_resource
+def get_attachment_registry():
+    return AttachmentRegistry(ATTACHMENT_REGISTRY_PATH)
+
+
 def send_files_to_slack(user_id, files, ticket_id, issue):
-    """Upload files to Slack and send them in a DM."""
+    """Upload files to Slack and send them in a DM, linking earlier uploads of identical files."""
     try:
         if not files:
             return True
 
         intro_message = f"📎 *Files attached to Ticket {ticket_id}*\n*Issue:* {issue}\n"
-        client.chat_postMessage(channel=user_id, text=intro_message)
+        slack_call("chat.postMessage", client.chat_postMessage, channel=user_id, text=intro_message)
 
-        for uploaded_file in files:
-            conversation = client.conversations_open(users=user_id)
-            channel_id = conversation['channel']['id']
+        conversation = slack_call("conversations.open", client.conversations_open, users=user_id)
+        channel_id = conversation['channel']['id']
+        registry = get_attachment_registry()
 
-            response = client.files_upload_v2(
+        reused = []
+        for uploaded_file in files:
+            content = uploaded_file.getvalue()
+            digest = hashlib.sha256(content).hexdigest()
+
+            upload = registry.lookup(digest, channel_id)
+            if upload and not upload["permalink"]:
+                try:
+                    info = slack_call("files.info", client.files_info, file=upload["file_id"])
+                    upload["permalink"] = info["file"]["permalink"]
+                    registry.record(digest, channel_id, uploaded_file.name, upload["file_id"], upload["permalink"])
+                except SlackApiError as e:
+                    print(f"⚠️ Earlier upload of {uploaded_file.name} is gone ({e.response['error']}), uploading again")
+                    registry.forget(digest, channel_id)
+                    upload = None
+            if upload:
+                reused.append(f"<{upload['permalink']}|{uploaded_file.name}>")
+                continue
+
+            response = slack_call(
+                "files.upload",
+                client.files_upload_v2,
                 channel=channel_id,
-                file=uploaded_file,
+                file=content,
                 filename=uploaded_file.name
             )
+            uploaded = response["files"][0]
+            registry.record(digest, channel_id, uploaded_file.name, uploaded["id"], uploaded.get("permalink"))
 
-        print(f"✅ {len(files)} file(s) sent to Slack user {user_id}")
+        if reused:
+            slack_call(
+                "chat.postMessage",
+                client.chat_postMessage,
+                channel=channel_id,
+                text="♻️ Already shared with you earlier: " + ", ".join(reused)
+            )
+
+        print(f"✅ {len(files)} file(s) sent to Slack user {user_id} ({len(reused)} linked from earlier uploads)")
         return True
 
     except SlackApiError as e:
@@ -210,78 +358,394 @@ def send_files_to_slack(user_id, files, ticket_id, issue):
         return False
 
 
+@st.cache_resource
+def get_ticket_store():
+    """The local SQLite mirror of the ticket data source, shared by every session."""
+    return TicketStore(TICKET_STORE_PATH)
+
+
+def read_tickets(store, governor):
+    """Bring the local ticket mirror up to date with Notion and read the tickets from it.
+
+    Tickets whose Issue and Comments are not mirrored yet come back with those empty (None);
+    the views that need the text fill it in with load_ticket_text().
+    """
+    store.sync(notion, DATASOURCE_ID, governor=governor)
+    return store.read(hot_since=hot_tickets_since())
+
+
+def hot_tickets_since():
+    """Old closed tickets live in the archive and are loaded per month on demand."""
+    return archive_cutoff(int(ARCHIVE_AFTER_DAYS)) if ARCHIVE_AFTER_DAYS else None
+
+
 def fetch_tickets_from_notion():
-    """Fetch all tickets from Notion database with pagination."""
+    """read_tickets() for a rerun, or None after showing the error to this session only."""
     try:
-        tickets = []
-        has_more = True
-        start_cursor = None
-
-        while has_more:
-            if start_cursor:
-                results = notion.data_sources.query(
-                    data_source_id=DATASOURCE_ID,
-                    start_cursor=start_cursor,
-                    sorts=[{"timestamp": "created_time", "direction": "ascending"}]
-                )
-            else:
-                results = notion.data_sources.query(
-                    data_source_id=DATASOURCE_ID,
-                    sorts=[{"timestamp": "created_time", "direction": "ascending"}]
-                )
+        return read_tickets(get_ticket_store(), get_notion_governor())
 
-            for page in results["results"]:
-                props = page["properties"]
-                ticket_id = props["ID"]["title"][0]["text"]["content"] if props["ID"]["title"] else ""
-                if not ticket_id or "-" not in ticket_id:
-                    ticket_id = "TICKET-0001"
-
-                ticket = {
-                    "page_id": page["id"],
-                    "ID": ticket_id,
-                    "Issue": props["Issue"]["rich_text"][0]["text"]["content"] if props["Issue"][
-                        "rich_text"] else "",
-                    "Status": props["Status"]["select"]["name"] if props["Status"]["select"] else "Open",
-                    "Priority": props["Priority"]["select"]["name"] if props["Priority"]["select"] else "Medium",
-                    "Date Submitted": props["Date Submitted"]["date"]["start"] if props["Date Submitted"][
-                        "date"] else "",
-                    "Submitted Time": props["Submitted Time"]["rich_text"][0]["text"][
-                        "content"] if props["Submitted Time"]["rich_text"] else "",
-                    "Created By": props["Created By"]["select"]["name"] if props["Created By"]["select"][
-                        "name"] else "",
-                    "Assigned To": props["Assigned To"]["select"]["name"] if props["Assigned To"]["select"][
-                        "name"] else "",
-                    "Resolved Date": props["Resolved Date"]["date"]["start"] if props.get("Resolved Date") and
-                                                                                props["Resolved Date"][
-                                                                                    "date"] else None,
-                    "Resolved Time": props["Resolved Time"]["rich_text"][0]["text"][
-                        "content"] if props["Resolved Time"]["rich_text"] else "",
-                    "Comments": props["Comments"]["rich_text"][0]["text"]["content"] if props["Comments"][
-                        "rich_text"] else "",
-                    "Ticket Type": props["Ticket Type"]["rich_text"][0]["text"]["content"] if props["Ticket Type"][
-                        "rich_text"] else "",
-                    "Notify": props["Notify"]["rich_text"][0]["text"]["content"] if props["Notify"][
-                        "rich_text"] else ""
-                }
-                tickets.append(ticket)
+    except Exception as e:
+        st.error(f"Error fetching tickets from Notion: {e}")
+        return None
 
-            has_more = results.get("has_more", False)
-            start_cursor = results.get("next_cursor", None)
 
-        df = pd.DataFrame(tickets)
-        if not df.empty:
-            if "Date Submitted" in df.columns:
-                df["Date Submitted"] = pd.to_datetime(df["Date Submitted"], format="%Y-%m-%d", errors='coerce')
-            if "Resolved Date" in df.columns:
-                df["Resolved Date"] = pd.to_datetime(df["Resolved Date"], format="%Y-%m-%d", errors='coerce')
+def read_local_tickets():
+    """The tickets already in the local mirror, without calling Notion; an empty frame if it can't be read."""
+    try:
+        return get_ticket_store().read(hot_since=hot_tickets_since())
+    except Exception as e:
+        print(f"❌ Error reading the local ticket mirror: {e}")
+        return pd.DataFrame(columns=["page_id"] + TICKET_COLUMNS + ["Category", "last_edited_time"])
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def load_archived_tickets(month_name):
+    """Load archived tickets for a month from the local archive, or the archive data source."""
+    try:
+        pages = read_archive(month_name, ARCHIVE_DIR)
+        if not pages and ARCHIVE_DATASOURCE_ID:
+            pages = [page for page in query_pages(notion, ARCHIVE_DATASOURCE_ID, governor=get_notion_governor())
+                     if partition_month_name(partition_key(page)) == month_name]
 
+        df = columns_frame(decode_pages(pages))
+        if not df.empty:
+            df["Category"] = df["Issue"].map(classify_ticket)
+            df["Date Submitted"] = pd.to_datetime(df["Date Submitted"], format="%Y-%m-%d", errors='coerce')
+            df["Resolved Date"] = pd.to_datetime(df["Resolved Date"], format="%Y-%m-%d", errors='coerce')
         return df
 
     except Exception as e:
-        st.error(f"Error fetching tickets from Notion: {e}")
-        return pd.DataFrame(
-            columns=["page_id", "ID", "Issue", "Status", "Priority", "Date Submitted", "Submitted Time",
-                     "Resolved Date", "Resolved Time", "Comments", "Ticket Type"])
+        print(f"❌ Error loading archived tickets for {month_name}: {e}")
+        return pd.DataFrame()
+
+
+def show_archived_tickets(month_name):
+    """Show archived tickets for the selected month as a read-only table."""
+    if not month_name or not (ARCHIVE_AFTER_DAYS or ARCHIVE_DATASOURCE_ID):
+        return False
+
+    with st.spinner("Loading archived tickets..."):
+        archived_df = load_archived_tickets(month_name)
+    if archived_df.empty:
+        return False
+
+    st.divider()
+    st.header("🗄️ Archived Tickets")
+    st.metric(label=f"Number of archived tickets ({month_name})", value=f"{len(archived_df):,}")
+    with st.expander("View Archived Tickets", expanded=False):
+        st.dataframe(archived_df.drop(columns=["page_id"], errors="ignore"), width="stretch", hide_index=True)
+    return True
+
+
+def same_value(old, new):
+    if pd.isna(old) and pd.isna(new):
+        return True
+    return old == new
+
+
+class SharedTickets:
+    """The one ticket frame every session reads from, replaced as a whole and never written to.
+
+    Sessions keep a reference to the frame they loaded and its version. Reloading or
+    patching a ticket publishes a new frame, and an old one is freed once no session
+    holds it any more.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.df = None
+        self.version = None
+        self.loaded_at = 0.0
+        self.nbytes = 0
+
+    def _publish(self, df):
+        self.df = df
+        self.version = uuid.uuid4().hex
+        self.loaded_at = time.monotonic()
+        self.nbytes = int(df.memory_usage(deep=True).sum())
+        return self.df, self.version
+
+    def current(self):
+        with self.lock:
+            return self.df, self.version
+
+    def load(self, max_age=0):
+        """The shared frame and its version, reloaded first if it is older than max_age seconds.
+
+        The fetch runs without the lock, so other sessions' reruns never wait on Notion. If it
+        fails, the current frame stays, or the local mirror is used when there is none yet.
+        """
+        with self.lock:
+            if self.df is not None and time.monotonic() - self.loaded_at <= max_age:
+                return self.df, self.version
+        df = fetch_tickets_from_notion()
+        if df is None and self.df is None:
+            df = read_local_tickets()
+        with self.lock:
+            if df is None:
+                return self.df, self.version
+            return self._publish(df)
+
+    def refresh(self, fetch):
+        """Fetch without holding the lock, so readers are never blocked, then publish the result.
+
+        A frame published while fetching (a patch or a manual reload) is at least as new
+        as what was fetched, so in that case the fetched frame is dropped.
+        """
+        version = self.version
+        df = fetch()
+        with self.lock:
+            if self.df is None or self.version == version:
+                return self._publish(df)
+            return self.df, self.version
+
+    def patch(self, df, tickets):
+        """A new frame with the given tickets written over their rows, published if `df` is the current shared frame."""
+        rows = dict(zip(df["page_id"], df.index))
+        changes = {(rows[ticket["page_id"]], column): value
+                   for ticket in tickets if ticket["page_id"] in rows
+                   for column, value in ticket.items()
+                   if column in df.columns and not same_value(df.at[rows[ticket["page_id"]], column], value)}
+        if not changes:
+            return df, None
+
+        patched = df.copy()  # lazy under copy-on-write: only the columns written below are copied
+        for (row, column), value in changes.items():
+            patched.at[row, column] = value
+
+        with self.lock:
+            if self.df is df:
+                return self._publish(patched)
+        return patched, uuid.uuid4().hex
+
+
+@st.cache_resource
+def get_shared_tickets():
+    return SharedTickets()
+
+
+@st.cache_resource
+def get_cache_warmer():
+    """Background thread that keeps the shared ticket frame fresh, or None if CACHE_WARM_INTERVAL is 0."""
+    if not CACHE_WARM_INTERVAL:
+        return None
+    shared, store, governor = get_shared_tickets(), get_ticket_store(), get_notion_governor()
+    return CacheWarmer(lambda: shared.refresh(lambda: read_tickets(store, governor)),
+                       interval=CACHE_WARM_INTERVAL, busy_interval=CACHE_WARM_BUSY_INTERVAL,
+                       working_hours=WORKING_HOURS, working_days=WORKING_DAYS, tz=pytz.timezone("Asia/Karachi"))
+
+
+def record_ticket_write(page_id, properties):
+    """Log the properties the app just wrote to a ticket in the local change log."""
+    try:
+        ticket = parse_ticket_page({"id": page_id, "properties": properties})
+        get_ticket_store().record_edit(page_id, {name: ticket[name] for name in properties if name in ticket},
+                                       actor=st.session_state.get("name"))
+    except Exception as e:
+        print(f"❌ Error logging changes to ticket {page_id}: {e}")
+
+
+def change_rows(events):
+    """Logged ticket changes as a table for display, newest first."""
+    changed_at = pd.to_datetime(events["changed_at"], utc=True).dt.tz_convert("Asia/Karachi")
+    changes = [
+        "Created" if field == "created" else "Deleted" if field == "deleted"
+        else f"{field}: {conflict_value(old)} → {conflict_value(new)}"
+        for field, old, new in zip(events["field"], events["old_value"], events["new_value"])
+    ]
+    return pd.DataFrame({
+        "When": changed_at.dt.strftime("%Y-%m-%d %I:%M %p"),
+        "Ticket": events["ticket_id"],
+        "Change": changes,
+        "By": events["actor"].fillna("Notion"),
+    }).iloc[::-1]
+
+
+def show_recent_changes(hours=24):
+    """Ticket changes made in the last `hours`, read from the local change log."""
+    since = datetime.datetime.now(datetime.timezone.utc) - timedelta(hours=hours)
+    events = get_ticket_store().events(since=since, limit=500)
+    events = events[events["field"] != "created"]
+    if events.empty:
+        return
+    with st.expander(f"🕘 Changes in the last {hours} hours ({len(events):,})", expanded=False):
+        st.dataframe(change_rows(events), width="stretch", hide_index=True)
+
+
+def show_pending_prints():
+    """Queue of open print, complimentary and proof orders, oldest first, regardless of month.
+
+    Uses the Category the ticket mirror stored when it classified each ticket's text. Open
+    tickets whose text isn't mirrored yet have none, and are classified only on request.
+    """
+    df = st.session_state.df
+    if "Category" not in df.columns:
+        return
+    active = df["Status"].isin(["Open", "In Progress"])
+    pending = df[(df["Category"] == "Printing") & active]
+    unclassified = df.loc[active & df["Category"].isna(), "page_id"].tolist()
+    st.header("🖨️ Pending Prints")
+    st.metric(label="Print orders waiting", value=f"{len(pending):,}")
+    if unclassified and st.button(f"Check {len(unclassified):,} open ticket(s) not classified yet",
+                                  key="classify_pending_prints"):
+        with st.spinner("Loading ticket text..."):
+            load_ticket_text(unclassified)
+        st.rerun()
+    if not pending.empty:
+        with st.expander("View Pending Prints", expanded=False):
+            if pending["Issue"].isna().any():
+                load_ticket_text(pending.loc[pending["Issue"].isna(), "page_id"].tolist())
+                pending = st.session_state.df[st.session_state.df["page_id"].isin(pending["page_id"])]
+            st.dataframe(pending.sort_values("Date Submitted")[["ID", "Issue", "Status", "Priority", "Date Submitted",
+                                                                 "Created By", "Assigned To"]],
+                         width="stretch", hide_index=True)
+    st.divider()
+
+
+def load_tickets_into_session(max_age=0):
+    """Point the session at the shared ticket frame, reloading it if older than max_age seconds.
+
+    While the cache warmer runs the frame is kept fresh in the background, so only an
+    explicit reload (max_age 0) or a server with no frame yet waits on Notion.
+    """
+    if max_age and get_cache_warmer():
+        max_age = float("inf")
+    st.session_state.df, st.session_state.df_version = get_shared_tickets().load(max_age)
+
+
+def adopt_shared_frame():
+    """Move the session onto the newest shared frame unless it has unsaved table edits."""
+    df, version = get_shared_tickets().current()
+    if "df" not in st.session_state or df is None or st.session_state.get("df_version") == version:
+        return
+    for key in ("active_editor", "closed_editor"):
+        edits = st.session_state.get(key) or {}
+        if edits.get("edited_rows") or edits.get("added_rows") or edits.get("deleted_rows"):
+            return
+    st.session_state.df, st.session_state.df_version = df, version
+
+
+def session_memory_bytes():
+    """Approximate memory this session holds on its own; the current shared frame counts as zero."""
+    shared = get_shared_tickets().df
+    total = 0
+    for value in st.session_state.to_dict().values():
+        if value is shared:
+            continue
+        if isinstance(value, pd.DataFrame):
+            total += int(value.memory_usage(deep=True).sum())
+        else:
+            try:
+                total += len(pickle.dumps(value))
+            except Exception:
+                pass
+    return total
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def aggregate_tickets(_df, df_version):
+    """Group tickets once by (Month, Status, Ticket Type) and return each group's row positions.
+
+    Keyed on df_version rather than the frame itself, so reruns caused by widget
+    interaction reuse the result until the tickets are reloaded.
+    """
+    keys = pd.DataFrame({
+        "Month": pd.to_datetime(_df["Date Submitted"], errors="coerce").dt.strftime("%B"),
+        "Status": _df["Status"],
+        "Ticket Type": _df["Ticket Type"],
+    })
+    return keys.groupby(["Month", "Status", "Ticket Type"], dropna=False, sort=False).indices
+
+
+def select_positions(groups, month=None, statuses=None, ticket_type=None):
+    """Collect the row positions of every aggregated group matching the filters."""
+    parts = [
+        positions for (group_month, status, group_type), positions in groups.items()
+        if (month is None or group_month == month)
+        and (statuses is None or status in statuses)
+        and (ticket_type is None or group_type == ticket_type)
+    ]
+    return np.sort(np.concatenate(parts)) if parts else np.array([], dtype=int)
+
+
+# Fields a session writes back to a ticket, merged with edits made since it loaded the ticket.
+MERGE_FIELDS = ["Issue", "Status", "Priority", "Resolved Date", "Comments", "Notify"]
+
+# Notion rounds last_edited_time down to the minute, so a second edit within the same
+# minute leaves it unchanged; tickets edited this recently are compared field by field.
+EDIT_TIME_GRANULARITY = timedelta(minutes=2)
+
+
+def fetch_ticket_from_notion(page_id):
+    """Fetch a single ticket page from Notion, or None if it can't be read."""
+    try:
+        page = notion_call(notion.pages.retrieve, page_id=page_id)
+        ticket = parse_ticket_page(page)
+        ticket["last_edited_time"] = page.get("last_edited_time", "")
+        ticket["Category"] = classify_ticket(ticket["Issue"])
+        ticket["Date Submitted"] = pd.to_datetime(ticket["Date Submitted"], format="%Y-%m-%d", errors='coerce')
+        ticket["Resolved Date"] = pd.to_datetime(ticket["Resolved Date"], format="%Y-%m-%d", errors='coerce')
+        return ticket
+    except Exception as e:
+        print(f"❌ Error refreshing ticket {page_id}: {e}")
+        return None
+
+
+def patch_tickets_in_session(tickets):
+    """Point the session at a frame with freshly fetched tickets written over their rows."""
+    df, version = get_shared_tickets().patch(st.session_state.df, tickets)
+    if version:
+        st.session_state.df, st.session_state.df_version = df, version
+
+
+def load_ticket_text(page_ids=None):
+    """Fill in the Issue and Comments left out of a summary load, for the given tickets or every ticket."""
+    store = get_ticket_store()
+    try:
+        store.load_text(notion, DATASOURCE_ID, page_ids=page_ids, governor=get_notion_governor())
+    except Exception as e:
+        st.error(f"Error loading ticket text from Notion: {e}")
+        return
+    if page_ids is None:
+        load_tickets_into_session()
+        return
+    patch_tickets_in_session([{"page_id": page_id, **text} for page_id, text in store.texts(page_ids).items()])
+
+
+def edited_since(base):
+    """The latest version of a ticket if it may have changed in Notion since `base` was loaded, else None.
+
+    Usually this costs one page request with only the title property, comparing
+    last_edited_time; the full page is fetched only when that changed or is too recent
+    to tell.
+    """
+    expected = base.get("last_edited_time")
+    if expected:
+        page = notion_call(notion.pages.retrieve, page_id=base["page_id"], filter_properties=["title"])
+        edited = page["last_edited_time"]
+        recent = pd.Timestamp.now(tz="UTC") - pd.Timestamp(edited) < EDIT_TIME_GRANULARITY
+        if edited == expected and not recent:
+            return None
+
+    latest = fetch_ticket_from_notion(base["page_id"])
+    if latest is None:
+        raise RuntimeError(f"could not read {base.get('ID', base['page_id'])} from Notion")
+    return latest
+
+
+def merge_ticket_edits(base, mine, latest):
+    """Three-way merge of a session's edits with the latest version of the ticket.
+
+    Returns the merged field values and the fields both sides changed to different values.
+    """
+    merged, conflicts = {}, []
+    for field in MERGE_FIELDS:
+        mine_changed = field in mine and not same_value(mine[field], base.get(field))
+        theirs_changed = not same_value(latest.get(field), base.get(field))
+        if mine_changed and theirs_changed and not same_value(mine[field], latest.get(field)):
+            conflicts.append(field)
+        merged[field] = mine[field] if mine_changed else latest.get(field)
+    return merged, conflicts
 
 
 def send_ticket_notifications(ticket_id, issue, priority, status, date, time, user_details, creator_name,
@@ -299,10 +763,10 @@ def send_ticket_notifications(ticket_id, issue, priority, status, date, time, us
 *❓ Issue:* \n{issue}
 
 Please review and update the ticket status accordingly."""
-            send_dm(user_details['receiver_id'], assigned_message)
-
-            if uploaded_files:
-                send_files_to_slack(user_details['receiver_id'], uploaded_files, ticket_id, issue)
+            # Attachments follow the notification, also when it waits for the next batch.
+            notify(user_details['receiver_id'], assigned_message, priority,
+                   then=(lambda: send_files_to_slack(user_details['receiver_id'], uploaded_files, ticket_id, issue))
+                   if uploaded_files else None)
 
             print(f"✅ Notification sent to {assigned_name} ({user_details['receiver_email']})")
         else:
@@ -321,7 +785,7 @@ Please review and update the ticket status accordingly."""
 *❓ Issue:* \n{issue}{files_text}
 
 Your ticket has been submitted and assigned. You'll be notified of any updates."""
-            send_dm(user_details['sender_id'], creator_message)
+            notify(user_details['sender_id'], creator_message, priority)
             print(f"✅ Confirmation sent to {creator_name} ({user_details['sender_email']})")
         elif user_details['sender_id'] == user_details['receiver_id']:
             print(f"ℹ️ Creator and assignee are the same person - sent only one notification")
@@ -380,26 +844,19 @@ def create_ticket_in_notion(ticket_id, issue, status, priority, date_submitted,
         formatted_time = now_pkt.time().strftime("%I:%M %p")
         formatted_date = date_submitted.strftime("%d-%B-%Y")
 
-        ticket_type = None
-        if name == assigned:
-            ticket_type = "Personal"
-        else:
-            ticket_type = "Normal"
-
-        properties = {
-            "ID": {"title": [{"text": {"content": ticket_id}}]},
-            "Issue": {"rich_text": [{"text": {"content": issue}}]},
-            "Status": {"select": {"name": status}},
-            "Priority": {"select": {"name": priority}},
-            "Created By": {"select": {"name": name}},
-            "Assigned To": {"select": {"name": assigned}},
-            "Date Submitted": {"date": {"start": date_submitted_str}},
-            "Submitted Time": {"rich_text": [{"text": {"content": formatted_time}}]},
-            "Ticket Type": {"rich_text": [{"text": {"content": ticket_type}}]},
-            "Notify": {"rich_text": [{"text": {"content": "Yes"}}]},
-        }
-
-        notion.pages.create(
+        properties = ticket_properties({
+            "ID": ticket_id,
+            "Issue": issue,
+            "Status": status,
+            "Priority": priority,
+            "Created By": name,
+            "Assigned To": assigned,
+            "Date Submitted": date_submitted_str,
+            "Submitted Time": formatted_time,
+        })
+
+        notion_call(
+            notion.pages.create,
             parent={"data_source_id": DATASOURCE_ID},
             properties=properties
         )
@@ -450,9 +907,9 @@ def send_ticket_update_notifications(ticket_id, old_status, new_status, old_prio
 *✏ Changes:*
 {changes_text}
 """
-            send_dm(user_details['receiver_id'], assigned_message)
-            if uploaded_files:
-                send_files_to_slack(user_details['receiver_id'], uploaded_files, ticket_id, issue)
+            notify(user_details['receiver_id'], assigned_message, new_priority,
+                   then=(lambda: send_files_to_slack(user_details['receiver_id'], uploaded_files, ticket_id, issue))
+                   if uploaded_files else None)
 
             print(f"✅ Update notification sent to {assigned_name} ({user_details['receiver_email']})")
 
@@ -464,7 +921,7 @@ def send_ticket_update_notifications(ticket_id, old_status, new_status, old_prio
 *✏ Changes:*
 {changes_text}
 """
-            send_dm(user_details['sender_id'], creator_message)
+            notify(user_details['sender_id'], creator_message, new_priority)
 
             # if uploaded_files:
             #     for f in uploaded_files:
@@ -483,10 +940,12 @@ def update_ticket_in_notion(page_id, issue, status, priority, resolved_date, com
     """Update an existing ticket in Notion and send notifications."""
     try:
         properties = {
-            "Issue": {"rich_text": [{"text": {"content": issue}}]},
             "Status": {"select": {"name": status}},
             "Priority": {"select": {"name": priority}},
         }
+        if issue is not None:
+            # None when the ticket's text never loaded; leave the Issue in Notion as it is.
+            properties["Issue"] = {"rich_text": rich_text(issue)}
 
         if resolved_date and pd.notna(resolved_date):
             if isinstance(resolved_date, (pd.Timestamp, datetime.datetime, datetime.date)):
@@ -498,20 +957,22 @@ def update_ticket_in_notion(page_id, issue, status, priority, resolved_date, com
                 formatted_time = now_pkt.time().strftime("%I:%M %p")
 
                 properties["Resolved Date"] = {"date": {"start": resolved_date_str}}
-                properties["Resolved Time"] = {"rich_text": [{"text": {"content": formatted_time}}]}
+                properties["Resolved Time"] = {"rich_text": rich_text(formatted_time)}
         else:
             properties["Resolved Date"] = {"date": None}
 
         if comments:
-            properties["Comments"] = {"rich_text": [{"text": {"content": comments}}]}
+            properties["Comments"] = {"rich_text": rich_text(comments)}
 
         if new_notify != old_notify and new_notify:
-            properties["Notify"] = {"rich_text": [{"text": {"content": new_notify}}]}
+            properties["Notify"] = {"rich_text": rich_text(new_notify)}
 
-        notion.pages.update(
+        notion_call(
+            notion.pages.update,
             page_id=page_id,
             properties=properties
         )
+        record_ticket_write(page_id, properties)
 
         if all([ticket_id, old_status, old_priority, creator_name, assigned_name]):
             formatted_resolved_date = None
@@ -542,6 +1003,273 @@ def update_ticket_in_notion(page_id, issue, status, priority, resolved_date, com
         return False
 
 
+def save_ticket_edits(base, mine, uploaded_files=None):
+    """Write a session's edits to a ticket, merging them with changes made since `base` was loaded.
+
+    `mine` maps the MERGE_FIELDS the session edited to their new values. Edits to fields
+    nobody else touched are merged and written; if someone else changed one of the same
+    fields, nothing is written and the clash is queued for show_ticket_conflicts().
+    Notion has no conditional write, so an edit landing between the check and the
+    write itself can still be overwritten. Returns "saved", "conflict" or "failed".
+    """
+    if pd.isna(base.get("Issue")):
+        load_ticket_text([base["page_id"]])
+        base = {**base, **get_ticket_store().texts([base["page_id"]]).get(base["page_id"], {})}
+
+    try:
+        latest = edited_since(base)
+    except Exception as e:
+        st.error(f"Error checking {base.get('ID')} for changes: {e}")
+        return "failed"
+
+    merged, conflicts = merge_ticket_edits(base, mine, latest if latest is not None else base)
+    if conflicts:
+        patch_tickets_in_session([latest])
+        st.session_state.setdefault("ticket_conflicts", {})[base["page_id"]] = {
+            "base": latest, "mine": mine, "conflicts": conflicts, "uploaded_files": uploaded_files,
+        }
+        return "conflict"
+
+    current = latest if latest is not None else base
+    success = update_ticket_in_notion(
+        page_id=base["page_id"],
+        issue=merged["Issue"],
+        status=merged["Status"],
+        priority=merged["Priority"],
+        resolved_date=merged["Resolved Date"],
+        comments=merged["Comments"] if "Comments" in mine else "",
+        old_status=current["Status"],
+        old_priority=current["Priority"],
+        ticket_id=current["ID"],
+        creator_name=current.get("Created By", "Unknown"),
+        assigned_name=current.get("Assigned To", "Unknown"),
+        new_notify=merged["Notify"] if "Notify" in mine else None,
+        old_notify=current.get("Notify"),
+        uploaded_files=uploaded_files,
+    )
+    return "saved" if success else "failed"
+
+
+def table_edits(original_row, edited_row):
+    """The MERGE_FIELDS changed in an edited table row."""
+    return {field: edited_row[field] for field in MERGE_FIELDS
+            if field in edited_row.index and not same_value(original_row[field], edited_row[field])}
+
+
+def conflict_value(value):
+    if isinstance(value, (pd.Timestamp, datetime.date)) and pd.notna(value):
+        return value.strftime("%Y-%m-%d")
+    if value is None or pd.isna(value) or value == "":
+        return "(empty)"
+    value = str(value)
+    return value if len(value) <= 80 else value[:77] + "..."
+
+
+def show_ticket_conflicts():
+    """Ask, field by field, how to resolve edits that clashed with changes made in Notion meanwhile."""
+    conflicts = st.session_state.get("ticket_conflicts") or {}
+    for page_id, conflict in list(conflicts.items()):
+        base, mine = conflict["base"], conflict["mine"]
+        with st.container(border=True):
+            st.warning(f"⚠️ **{base['ID']}** was changed by someone else while you were editing it. "
+                       f"Choose which version to keep for each field both of you changed.")
+            choices = {}
+            for field in conflict["conflicts"]:
+                options = [f"Mine: {conflict_value(mine[field])}", f"Theirs: {conflict_value(base.get(field))}"]
+                choices[field] = st.radio(field, options, key=f"conflict_{page_id}_{field}", horizontal=True)
+            others = [field for field in mine if field not in conflict["conflicts"]
+                      and not same_value(mine[field], base.get(field))]
+            if others:
+                st.caption(f"Your other changes will be saved too: {', '.join(others)}")
+
+            save_col, discard_col = st.columns(2)
+            if save_col.button("💾 Save with these choices", key=f"conflict_save_{page_id}"):
+                resolved = {field: value for field, value in mine.items()
+                            if field not in choices or choices[field].startswith("Mine")}
+                del conflicts[page_id]
+                with st.spinner("Updating ticket in Notion..."):
+                    result = save_ticket_edits(base, resolved, conflict["uploaded_files"])
+                if result == "failed":
+                    conflicts[page_id] = conflict
+                else:
+                    if result == "saved":
+                        st.session_state.conflict_message = f"✅ Ticket **{base['ID']}** updated successfully!"
+                        load_tickets_into_session()
+                    st.rerun()
+            if discard_col.button("🗑️ Discard my changes", key=f"conflict_discard_{page_id}"):
+                del conflicts[page_id]
+                st.rerun()
+
+    if st.session_state.get("conflict_message"):
+        st.success(st.session_state.pop("conflict_message"))
+
+
+BULK_ACTIONS = ["Close", "Reassign", "Change Priority", "Set Notify"]
+BULK_WORKERS = 4
+
+
+@st.cache_resource
+def get_notion_governor():
+    """One Notion rate governor for every session and thread in this server process."""
+    return RateGovernor(NOTION_BUDGETS)
+
+
+def notion_call(func, **kwargs):
+    """Call a Notion API endpoint through the shared rate governor."""
+    return get_notion_governor().call("notion", func, **kwargs)
+
+
+def select_bulk_tickets(df, statuses, assigned, created, priorities, issue_text):
+    """Tickets matching the bulk action filters; "Anyone" matches every person."""
+    mask = df["Status"].isin(statuses) & df["Priority"].isin(priorities)
+    if assigned != "Anyone":
+        mask &= df["Assigned To"] == assigned
+    if created != "Anyone":
+        mask &= df["Created By"] == created
+    if issue_text.strip():
+        mask &= df["Issue"].astype("string").str.contains(issue_text.strip(), case=False, na=False, regex=False)
+    return df[mask]
+
+
+def bulk_action_properties(action, ticket, value, now_pkt):
+    """Notion properties a bulk action writes to one ticket and a line describing the change.
+
+    Returns (None, None) when the ticket already has the requested value.
+    """
+    if action == "Close":
+        if ticket["Status"] == "Closed":
+            return None, None
+        properties = {
+            "Status": {"select": {"name": "Closed"}},
+            "Resolved Date": {"date": {"start": now_pkt.strftime("%Y-%m-%d")}},
+            "Resolved Time": {"rich_text": rich_text(now_pkt.strftime("%I:%M %p"))},
+        }
+        return properties, f"*Status:* {ticket['Status']} → Closed"
+
+    if action == "Reassign":
+        if ticket["Assigned To"] == value:
+            return None, None
+        ticket_type = "Personal" if ticket["Created By"] == value else "Normal"
+        properties = {
+            "Assigned To": {"select": {"name": value}},
+            "Ticket Type": {"rich_text": rich_text(ticket_type)},
+        }
+        return properties, f"*Assigned To:* {ticket['Assigned To']} → {value}"
+
+    if action == "Change Priority":
+        if ticket["Priority"] == value:
+            return None, None
+        return {"Priority": {"select": {"name": value}}}, f"*Priority:* {ticket['Priority']} → {value}"
+
+    if ticket["Notify"] == value:
+        return None, None
+    return {"Notify": {"rich_text": rich_text(value)}}, f"*Notify:* {ticket['Notify'] or 'Yes'} → {value}"
+
+
+def run_bulk_action(tickets, action, value, progress=None):
+    """Apply one action to many tickets with concurrent Notion updates under the shared rate limit.
+
+    Returns the (ticket, change) pairs that were written and the IDs that failed.
+    """
+    governor = get_notion_governor()
+    now_pkt = datetime.datetime.now(pytz.timezone("Asia/Karachi"))
+    jobs = []
+    for ticket in tickets:
+        properties, change = bulk_action_properties(action, ticket, value, now_pkt)
+        if properties:
+            jobs.append((ticket, properties, change))
+
+    updated, failed = [], []
+    with ThreadPoolExecutor(max_workers=BULK_WORKERS) as pool:
+        futures = {pool.submit(governor.call, "notion", notion.pages.update, page_id=ticket["page_id"],
+                               properties=properties): (ticket, properties, change)
+                   for ticket, properties, change in jobs}
+        for done, future in enumerate(as_completed(futures), start=1):
+            ticket, properties, change = futures[future]
+            try:
+                future.result()
+                updated.append((ticket, change))
+                record_ticket_write(ticket["page_id"], properties)
+            except Exception as e:
+                print(f"❌ Bulk {action} failed for {ticket['ID']}: {e}")
+                failed.append(ticket["ID"])
+            if progress:
+                progress.progress(done / len(futures), text=f"Updated {done} of {len(futures)} tickets")
+    return updated, failed
+
+
+def send_bulk_summaries(action, updated, value=None):
+    """Send every creator and assignee touched by a bulk action one DM listing all their changes."""
+    changes_by_person = defaultdict(list)
+    for ticket, change in updated:
+        people = {ticket["Created By"], ticket["Assigned To"]}
+        if action == "Reassign":
+            people.add(value)
+        # Issue is None or NaN when the ticket's text couldn't be loaded; the line goes without it.
+        snippet = f" ({ticket['Issue'][:80]})" if pd.notna(ticket["Issue"]) and ticket["Issue"] else ""
+        for name in people:
+            changes_by_person[name].append(f"• *{ticket['ID']}*{snippet}: {change}")
+
+    for name, lines in changes_by_person.items():
+        email = name_all.get(name)
+        user_id = get_user_id_by_email(email) if email else None
+        if not user_id:
+            print(f"⚠️ Could not send bulk update summary to {name} - Slack ID not found")
+            continue
+        message = f"🧰 *Bulk update — {action}*\n{len(lines)} of your tickets changed:\n" + "\n".join(lines)
+        send_dm(user_id, message)
+
+
+def show_bulk_actions():
+    """Admin controls to select tickets by filter and change them all in one job."""
+    if "bulk_result" in st.session_state:
+        updated_count, failed = st.session_state.pop("bulk_result")
+        if updated_count:
+            st.success(f"✅ {updated_count} ticket(s) updated.")
+        if failed:
+            st.error(f"❌ {len(failed)} ticket(s) failed: {', '.join(failed)}")
+
+    if "df" not in st.session_state:
+        load_tickets_into_session(SHARED_FRAME_MAX_AGE)
+
+    names = list(st.secrets.get("NAMES", []))
+    statuses = st.multiselect("Status", STATUSES, default=["Open", "In Progress"], key="bulk_statuses")
+    assigned = st.selectbox("Assigned To", ["Anyone"] + names, key="bulk_assigned")
+    created = st.selectbox("Created By", ["Anyone"] + names, key="bulk_created")
+    priorities = st.multiselect("Priority", PRIORITIES, default=list(PRIORITIES), key="bulk_priorities")
+    issue_text = st.text_input("Issue contains", placeholder="e.g. Printed", key="bulk_issue_text")
+    if issue_text.strip() and st.session_state.df["Issue"].isna().any():
+        with st.spinner("Loading ticket text..."):
+            load_ticket_text()
+
+    selected = select_bulk_tickets(st.session_state.df, statuses, assigned, created, priorities, issue_text)
+    st.caption(f"{len(selected)} ticket(s) match")
+    if not selected.empty:
+        st.dataframe(selected[["ID", "Issue", "Status", "Assigned To"]], hide_index=True, height=150)
+
+    action = st.selectbox("Action", BULK_ACTIONS, key="bulk_action")
+    value = None
+    if action == "Reassign":
+        value = st.selectbox("Reassign to", names, key="bulk_reassign_to")
+    elif action == "Change Priority":
+        value = st.selectbox("New priority", PRIORITIES, key="bulk_new_priority")
+    elif action == "Set Notify":
+        value = st.selectbox("Notify", ["Yes", "No"], key="bulk_notify")
+    send_summaries = st.checkbox("Send each person one summary", value=True, key="bulk_send_summaries")
+
+    if st.button(f"Apply to {len(selected)} ticket(s)", type="primary", disabled=selected.empty, key="bulk_apply"):
+        if selected["Issue"].isna().any():
+            load_ticket_text(selected.loc[selected["Issue"].isna(), "page_id"].tolist())
+            selected = st.session_state.df[st.session_state.df["page_id"].isin(selected["page_id"])]
+        progress = st.progress(0.0, text="Updating tickets...")
+        updated, failed = run_bulk_action(selected.to_dict("records"), action, value, progress)
+        if send_summaries and updated:
+            send_bulk_summaries(action, updated, value)
+        st.session_state.bulk_result = (len(updated), failed)
+        load_tickets_into_session()
+        st.rerun()
+
+
 def main():
     """Main application entry point"""
     setup_page()
@@ -554,6 +1282,9 @@ def main():
         login_page(auth)
         return
 
+    get_cache_warmer()
+    adopt_shared_frame()
+
     st.title(f"🎫 Support Tickets for Blink Digitally")
     st.write(f"Welcome, **{st.session_state.get('name')}**!")
     st.write("Use this app to submit in any publishing updates, republication details, or reminders.")
@@ -581,10 +1312,58 @@ def main():
                 st.session_state.admin_authenticated = False
                 st.rerun()
 
+            if PROFILE_RERUNS and st.session_state.get("last_profile"):
+                last_profile = st.session_state.last_profile
+                with st.expander(f"⏱️ Last Rerun ({last_profile['duration_s']:.2f}s)"):
+                    st.caption(f"Saved to {PROFILE_DIR}/ at {last_profile['timestamp']}")
+                    st.dataframe(pd.DataFrame(last_profile["hotspots"]), width="stretch", hide_index=True)
+
+            with st.expander("🧰 Bulk Actions"):
+                show_bulk_actions()
+
+            with st.expander("🧠 Session Memory"):
+                shared = get_shared_tickets()
+                private_mb = session_memory_bytes() / 1024 / 1024
+                st.progress(min(private_mb / SESSION_MEMORY_BUDGET_MB, 1.0),
+                            text=f"This session: {private_mb:.2f} MB of {SESSION_MEMORY_BUDGET_MB:g} MB")
+                if private_mb > SESSION_MEMORY_BUDGET_MB:
+                    st.warning("This session holds more than its memory budget.")
+                if shared.df is not None:
+                    st.caption(f"Shared ticket frame: {shared.nbytes / 1024 / 1024:.2f} MB for "
+                               f"{len(shared.df):,} tickets, held once for all sessions")
+                warmer = get_cache_warmer()
+                if warmer:
+                    warm_stats = warmer.snapshot()
+                    age = f"{warm_stats['age_s']:.0f}s ago" if warm_stats["age_s"] is not None else "not yet"
+                    st.caption(f"Refreshed in the background {age} ({warm_stats['last_duration_s'] or 0:.2f}s), "
+                               f"every {warm_stats['interval_s']}s "
+                               f"{'during working hours' if warm_stats['busy'] else 'outside working hours'}; "
+                               f"{warm_stats['errors']} error(s)")
+
+            with st.expander("📮 Slack Queue"):
+                slack_stats = get_slack_governor().snapshot()
+                if slack_stats:
+                    st.dataframe(pd.DataFrame.from_dict(slack_stats, orient="index"), width="stretch")
+                else:
+                    st.caption("No Slack calls made yet.")
+
+                batch_stats = get_notification_scheduler().snapshot()
+                st.caption(
+                    f"Batched notifications: {batch_stats['messages_waiting']} waiting for "
+                    f"{batch_stats['recipients_waiting']} people (oldest {batch_stats['oldest_waiting_s']:.0f}s, "
+                    f"sent every {NOTIFY_BATCH_SECONDS}s)"
+                    + (f", {batch_stats['batches_failed']} failed send(s) retried" if batch_stats["batches_failed"]
+                       else "")
+                )
+                if batch_stats["messages_waiting"] and st.button("📨 Send batched now"):
+                    get_notification_scheduler().flush()
+                    st.rerun()
+
     if st.button("🔄 Fetch Latest"):
         with st.spinner("Loading tickets from Notion..."):
-            st.session_state.df = fetch_tickets_from_notion()
-            st.session_state.original_df = st.session_state.df.copy()
+            load_tickets_into_session()
+
+    show_ticket_conflicts()
 
     col1, col2 = st.tabs(["Add Ticket", "Update Ticket"])
 
@@ -651,7 +1430,8 @@ def main():
                     try:
                         with st.spinner("Fetching latest ticket from Notion..."):
                             try:
-                                results = notion.data_sources.query(
+                                results = notion_call(
+                                    notion.data_sources.query,
                                     data_source_id=DATASOURCE_ID,
                                     page_size=1,
                                     sorts=[{"timestamp": "created_time", "direction": "descending"}]
@@ -674,6 +1454,13 @@ def main():
                                 st.warning(f"⚠️ Could not fetch the latest ticket ID: {e}. Defaulting to TICKET-0000")
                                 recent_ticket_number = 0
 
+                            # The newest page is not always the highest number, e.g. after a bulk import.
+                            try:
+                                recent_ticket_number = max(recent_ticket_number,
+                                                           get_ticket_store().highest_ticket_number())
+                            except Exception as e:
+                                print(f"⚠️ Could not read the highest ticket ID from the local store: {e}")
+
                             new_ticket_id = f"TICKET-{recent_ticket_number + 1}"
 
                         with st.spinner("Creating ticket in Notion..."):
@@ -693,8 +1480,7 @@ def main():
                                     st.success(f"✅ Ticket **{new_ticket_id}** created successfully in Notion!")
                                     if uploaded_files:
                                         st.success(f"📎 {len(uploaded_files)} file(s) sent to {assigned}")
-                                    st.session_state.df = fetch_tickets_from_notion()
-                                    st.session_state.original_df = st.session_state.df.copy()
+                                    load_tickets_into_session()
                                     st.rerun()
                                 else:
                                     st.error("❌ Failed to create the ticket in Notion. Please try again later.")
@@ -709,11 +1495,10 @@ def main():
         st.header("✏️ Update an Existing Ticket")
 
         if "df" not in st.session_state:
-            st.session_state.df = fetch_tickets_from_notion()
-            st.session_state.original_df = st.session_state.df.copy()
+            load_tickets_into_session(SHARED_FRAME_MAX_AGE)
 
-        temp_df = st.session_state.df.copy()
-        active_tickets = temp_df[temp_df["Status"].isin(["Open", "In Progress"])]
+        df = st.session_state.df
+        active_tickets = df[df["Status"].isin(["Open", "In Progress"])]
 
         if active_tickets.empty:
             st.info("No active tickets available to update.")
@@ -724,6 +1509,23 @@ def main():
             if selected_ticket:
                 ticket_data = active_tickets[active_tickets["ID"] == selected_ticket].iloc[0]
 
+                # Once per selection: one title-only request, and the full page only if it changed.
+                if st.session_state.get("refreshed_ticket") != selected_ticket:
+                    st.session_state.refreshed_ticket = selected_ticket
+                    try:
+                        latest = edited_since(ticket_data.to_dict())
+                    except Exception as e:
+                        print(f"❌ Error checking {selected_ticket} for changes: {e}")
+                        latest = None
+                    if latest is not None:
+                        patch_tickets_in_session([latest])
+                        ticket_data = pd.Series({**ticket_data.to_dict(), **latest})
+
+                if pd.isna(ticket_data["Issue"]):
+                    page_id = ticket_data["page_id"]
+                    load_ticket_text([page_id])
+                    ticket_data = st.session_state.df[st.session_state.df["page_id"] == page_id].iloc[0]
+
                 st.markdown(f"<p style='font-size: 16px;'>📄 Issue: {ticket_data['Issue']}</p>", unsafe_allow_html=True)
                 st.markdown(f"<p style='font-size: 16px;'>📊 Current Status: {ticket_data['Status']}</p>",
                             unsafe_allow_html=True)
@@ -734,6 +1536,12 @@ def main():
                 st.markdown(f"<p style='font-size: 16px;'>📕 Assigned To: {ticket_data['Assigned To']}</p>",
                             unsafe_allow_html=True)
 
+                history = get_ticket_store().events(page_id=ticket_data["page_id"])
+                if not history.empty:
+                    with st.expander(f"🕘 History ({len(history)})", expanded=False):
+                        st.dataframe(change_rows(history).drop(columns=["Ticket"]), width="stretch",
+                                     hide_index=True)
+
                 new_notify = ticket_data["Notify"]
                 if st.session_state.get("admin_authenticated", False):
                     new_notify = st.selectbox("Update Notify", ["Yes", "No"],
@@ -789,32 +1597,26 @@ def main():
                         else:
                             with st.spinner("Updating ticket in Notion..."):
                                 try:
-                                    page_id = ticket_data["page_id"]
-                                    success = update_ticket_in_notion(
-                                        page_id=page_id,
-                                        issue=ticket_data["Issue"],
-                                        status=new_status,
-                                        priority=new_priority,
-                                        resolved_date=resolved_date,
-                                        comments=comments,
-                                        old_status=ticket_data["Status"],
-                                        old_priority=ticket_data["Priority"],
-                                        ticket_id=ticket_data["ID"],
-                                        creator_name=ticket_data.get("Created By", "Unknown"),
-                                        assigned_name=ticket_data.get("Assigned To", "Unknown"),
-                                        new_notify=new_notify,
-                                        old_notify=ticket_data["Notify"],
-                                        uploaded_files=update_uploaded_files if update_uploaded_files else None,
-                                    )
-
-                                    if success:
+                                    mine = {"Status": new_status, "Priority": new_priority}
+                                    if resolved_date:
+                                        mine["Resolved Date"] = pd.Timestamp(resolved_date)
+                                    if comments.strip():
+                                        mine["Comments"] = comments
+                                    if new_notify != ticket_data["Notify"]:
+                                        mine["Notify"] = new_notify
+
+                                    result = save_ticket_edits(ticket_data.to_dict(), mine,
+                                                               update_uploaded_files or None)
+                                    if result == "conflict":
+                                        st.rerun()
+
+                                    if result == "saved":
                                         st.success(f"✅ Ticket **{selected_ticket}** updated successfully!")
                                         if update_uploaded_files:
                                             st.success(
                                                 f"📎 {len(update_uploaded_files)} file(s) sent via Slack."
                                             )
-                                        st.session_state.df = fetch_tickets_from_notion()
-                                        st.session_state.original_df = st.session_state.df.copy()
+                                        load_tickets_into_session()
                                         st.rerun()
                                     else:
                                         st.error("❌ Failed to update the ticket.")
@@ -825,43 +1627,43 @@ def main():
     st.divider()
 
     if "df" not in st.session_state:
-        st.session_state.df = fetch_tickets_from_notion()
-        st.session_state.original_df = st.session_state.df.copy()
+        load_tickets_into_session(SHARED_FRAME_MAX_AGE)
 
-    df = st.session_state.df.copy()
-    df["Month"] = df["Date Submitted"].dt.strftime("%B")
-    unique_months = sorted(df["Month"].unique().tolist())
+    show_pending_prints()
+    df = st.session_state.df
+    show_recent_changes()
+
+    groups = aggregate_tickets(df, st.session_state.df_version)
+    unique_months = {month for month, _, _ in groups if isinstance(month, str)}
+    if ARCHIVE_AFTER_DAYS:
+        unique_months |= set(archived_month_names(ARCHIVE_DIR))
+    unique_months = sorted(unique_months)
     months = ["All"] + unique_months
 
     current_month = datetime.datetime.now(pkt).strftime("%B")
     default_index = months.index("All") if current_month in months else 0
 
     selected_month = st.selectbox("📅 Choose a month to filter tickets", months, index=default_index)
-
-    if selected_month == "All":
-        filtered_df = df.copy()
-    else:
-        filtered_df = df[df["Month"] == selected_month].copy()
+    month_filter = None if selected_month == "All" else selected_month
 
     st.subheader(f"📊 Showing tickets for: **{selected_month}**")
 
-    normal_count = len(filtered_df[filtered_df["Ticket Type"] == "Normal"])
-    personal_count = len(filtered_df[filtered_df["Ticket Type"] == "Personal"])
+    normal_count = len(select_positions(groups, month_filter, ticket_type="Normal"))
+    personal_count = len(select_positions(groups, month_filter, ticket_type="Personal"))
 
     st.metric(label="Total Normal Tickets Found", value=normal_count)
     st.metric(label="Total Personal Tickets Found", value=personal_count)
 
-    if filtered_df.empty:
-        st.info("No tickets found for the selected month.")
+    if not len(select_positions(groups, month_filter)):
+        if not show_archived_tickets(month_filter):
+            st.info("No tickets found for the selected month.")
         st.stop()
 
-    active_df = filtered_df[filtered_df["Status"].isin(["Open", "In Progress"])].copy()
-    personal_active = active_df[active_df["Ticket Type"] == "Personal"]
-    active_df = active_df[active_df["Ticket Type"] == "Normal"]
+    active_df = df.iloc[select_positions(groups, month_filter, ["Open", "In Progress"], "Normal")]
+    personal_active = select_positions(groups, month_filter, ["Open", "In Progress"], "Personal")
 
-    closed_df = filtered_df[filtered_df["Status"] == "Closed"].copy()
-    personal_closed = closed_df[closed_df["Ticket Type"] == "Personal"]
-    closed_df = closed_df[closed_df["Ticket Type"] == "Normal"]
+    closed_df = df.iloc[select_positions(groups, month_filter, ["Closed"], "Normal")]
+    personal_closed = select_positions(groups, month_filter, ["Closed"], "Personal")
 
     st.header("🟢 Active Tickets")
 
@@ -885,10 +1687,11 @@ def main():
             icon="✍️",
         )
 
-    display_active_df = active_df.drop(columns=["page_id", "Month", "Resolved Time"], errors="ignore")
+    display_active_df = active_df.drop(columns=["page_id", "Month", "Resolved Time", "last_edited_time"],
+                                       errors="ignore")
 
     disabled_columns = ["ID", "Date Submitted", "Month", "Resolved Time", "Submitted Time", "Created By", "Assigned To",
-                        "Ticket Type"]
+                        "Ticket Type", "Category"]
     if not st.session_state.get("admin_authenticated", False):
         disabled_columns = list(display_active_df.columns)
 
@@ -910,40 +1713,23 @@ def main():
     if st.session_state.get("admin_authenticated", False) and not edited_active_df.equals(display_active_df):
         if st.button("💾 Save Active Tickets to Notion", type="primary", key="save_active"):
             with st.spinner("Saving changes to Notion..."):
-                success_count, error_count = 0, 0
+                results = Counter()
 
                 for idx in edited_active_df.index:
                     original_row = display_active_df.loc[idx]
                     edited_row = edited_active_df.loc[idx]
 
                     if not original_row.equals(edited_row):
-                        page_id = active_df.loc[idx, "page_id"]
-                        success = update_ticket_in_notion(
-                            page_id=page_id,
-                            issue=edited_row["Issue"],
-                            status=edited_row["Status"],
-                            priority=edited_row["Priority"],
-                            resolved_date=edited_row["Resolved Date"],
-                            comments=edited_row["Comments"],
-                            old_status=original_row["Status"],
-                            old_priority=original_row["Priority"],
-                            ticket_id=original_row["ID"],
-                            creator_name=original_row.get("Created By", "Unknown"),
-                            assigned_name=original_row.get("Assigned To", "Unknown"),
-                        )
-
-                        if success:
-                            success_count += 1
-                        else:
-                            error_count += 1
+                        result = save_ticket_edits(active_df.loc[idx].to_dict(),
+                                                   table_edits(original_row, edited_row))
+                        results[result] += 1
 
-                if success_count > 0:
-                    st.success(f"✅ {success_count} ticket(s) updated successfully! Notifications sent.")
-                if error_count > 0:
-                    st.error(f"❌ {error_count} ticket(s) failed to update.")
+                if results["saved"] > 0:
+                    st.success(f"✅ {results['saved']} ticket(s) updated successfully! Notifications sent.")
+                if results["failed"] > 0:
+                    st.error(f"❌ {results['failed']} ticket(s) failed to update.")
 
-                st.session_state.df = fetch_tickets_from_notion()
-                st.session_state.original_df = st.session_state.df.copy()
+                load_tickets_into_session()
                 st.rerun()
 
     st.divider()
@@ -967,10 +1753,10 @@ def main():
         st.info("No closed tickets for the selected month.")
     else:
         with st.expander("View Closed Tickets", expanded=False):
-            display_closed_df = closed_df.drop(columns=["page_id", "Month"], errors="ignore")
+            display_closed_df = closed_df.drop(columns=["page_id", "Month", "last_edited_time"], errors="ignore")
 
             disabled_closed_columns = ["ID", "Date Submitted", "Month", "Resolved Time", "Submitted Time", "Created By",
-                                       "Assigned To", "Ticket Type"]
+                                       "Assigned To", "Ticket Type", "Category"]
             if not st.session_state.get("admin_authenticated", False):
                 disabled_closed_columns = list(display_closed_df.columns)
 
@@ -993,42 +1779,107 @@ def main():
             if st.session_state.get("admin_authenticated", False) and not edited_closed_df.equals(display_closed_df):
                 if st.button("💾 Save Closed Tickets to Notion", type="primary", key="save_closed"):
                     with st.spinner("Saving changes to Notion..."):
-                        success_count, error_count = 0, 0
+                        results = Counter()
 
                         for idx in edited_closed_df.index:
                             original_row = display_closed_df.loc[idx]
                             edited_row = edited_closed_df.loc[idx]
 
                             if not original_row.equals(edited_row):
-                                page_id = closed_df.loc[idx, "page_id"]
-                                success = update_ticket_in_notion(
-                                    page_id=page_id,
-                                    issue=edited_row["Issue"],
-                                    status=edited_row["Status"],
-                                    priority=edited_row["Priority"],
-                                    resolved_date=edited_row["Resolved Date"],
-                                    comments=edited_row["Comments"],
-                                    old_status=original_row["Status"],
-                                    old_priority=original_row["Priority"],
-                                    ticket_id=original_row["ID"],
-                                    creator_name=original_row.get("Created By", "Unknown"),
-                                    assigned_name=original_row.get("Assigned To", "Unknown"),
-                                )
+                                result = save_ticket_edits(closed_df.loc[idx].to_dict(),
+                                                           table_edits(original_row, edited_row))
+                                results[result] += 1
 
-                                if success:
-                                    success_count += 1
-                                else:
-                                    error_count += 1
+                        if results["saved"] > 0:
+                            st.success(f"✅ {results['saved']} ticket(s) updated successfully! Notifications sent.")
+                        if results["failed"] > 0:
+                            st.error(f"❌ {results['failed']} ticket(s) failed to update.")
 
-                        if success_count > 0:
-                            st.success(f"✅ {success_count} ticket(s) updated successfully! Notifications sent.")
-                        if error_count > 0:
-                            st.error(f"❌ {error_count} ticket(s) failed to update.")
-
-                        st.session_state.df = fetch_tickets_from_notion()
-                        st.session_state.original_df = st.session_state.df.copy()
+                        load_tickets_into_session()
                         st.rerun()
 
 
+    show_archived_tickets(month_filter)
+
+
+def save_rerun_profile(profiler, duration):
+    """Write a rerun's profile and metadata to PROFILE_DIR and keep its hot spots for the sidebar."""
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        base = os.path.join(PROFILE_DIR, f"{stamp}-{st.session_state.get('profile_session', 'session')}")
+
+        stats = pstats.Stats(profiler)
+        stats.dump_stats(f"{base}.prof")
+
+        hotspots = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:15]
+        profile = {
+            "timestamp": stamp,
+            "duration_s": round(duration, 3),
+            "user": st.session_state.get("name"),
+            "tickets": len(st.session_state.df) if "df" in st.session_state else 0,
+            "df_version": st.session_state.get("df_version"),
+            "hotspots": [
+                {
+                    "function": f"{os.path.basename(filename)}:{line}({function})",
+                    "calls": calls,
+                    "self_s": round(self_time, 4),
+                    "cumulative_s": round(cumulative, 4),
+                }
+                for (filename, line, function), (_, calls, self_time, cumulative, _) in hotspots
+            ],
+        }
+        with open(f"{base}.json", "w", encoding="utf-8") as f:
+            json.dump(profile, f, indent=2)
+
+        for old_path in sorted(glob.glob(os.path.join(PROFILE_DIR, "*.prof")))[:-PROFILE_KEEP]:
+            os.remove(old_path)
+            if os.path.exists(old_path[:-len(".prof")] + ".json"):
+                os.remove(old_path[:-len(".prof")] + ".json")
+
+        st.session_state.last_profile = profile
+
+    except Exception as e:
+        print(f"❌ Error saving rerun profile: {e}")
+
+
+# cProfile hooks the whole process (sys.monitoring on Python 3.12+), so one rerun is profiled at a time.
+PROFILE_LOCK = threading.Lock()
+
+
+def run_profiled(entry_point):
+    """Run one rerun, under cProfile when PROFILE_RERUNS is on and the session is an admin.
+
+    While another session's rerun is being profiled this one runs unprofiled. Calls made
+    by other sessions' threads during the rerun can still show up in its profile.
+    """
+    if not (PROFILE_RERUNS and st.session_state.get("admin_authenticated", False)):
+        entry_point()
+        return
+    if not PROFILE_LOCK.acquire(blocking=False):
+        entry_point()
+        return
+
+    try:
+        if "profile_session" not in st.session_state:
+            st.session_state.profile_session = uuid.uuid4().hex[:8]
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError as e:
+            # Another profiler or debugger already holds the process-wide hooks.
+            print(f"⚠️ Skipping rerun profile: {e}")
+            profiler = None
+        started = time.perf_counter()
+        try:
+            entry_point()
+        finally:
+            if profiler:
+                profiler.disable()
+                save_rerun_profile(profiler, time.perf_counter() - started)
+    finally:
+        PROFILE_LOCK.release()
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    run_profiled(main)
@@ -0,0 +1,48 @@
+import pandas as pd
+
+from escalation import EscalationIndex, submitted_at
+
+
+def ticket(page_id, **fields):
+    return dict({
+        "page_id": page_id, "ID": page_id, "Issue": "Printer jammed", "Priority": "High",
+        "Assigned To": "Ayesha Khan", "Created By": "Bilal Ahmed", "Ticket Type": "Normal",
+        "Date Submitted": "2026-10-01", "Submitted Time": "09:00 AM", "Notify": "Yes", "Category": "Hardware",
+    }, **fields)
+
+
+def test_muted_overdue_ticket_is_not_listed_or_escalated():
+    index = EscalationIndex()
+    index.sync(pd.DataFrame([ticket("1"), ticket("2", Notify="No")]))
+    now = submitted_at("2026-10-10", "09:00 AM")
+
+    assert [t["page_id"] for t in index.overdue("Ayesha Khan", now)] == ["1"]
+    assert [t["page_id"] for t in index.escalations(now, "2026-10-10")] == ["1"]
+
+
+def test_muting_a_ticket_drops_it_from_the_index():
+    index = EscalationIndex()
+    index.sync(pd.DataFrame([ticket("1")]))
+    index.sync(pd.DataFrame([ticket("1", Notify="No")]))
+
+    assert index.overdue("Ayesha Khan", submitted_at("2026-10-10", "09:00 AM")) == []
+
+
+def test_printing_and_personal_tickets_are_not_indexed():
+    index = EscalationIndex()
+    index.sync(pd.DataFrame([
+        ticket("1", Category="Printing"),
+        ticket("2", **{"Ticket Type": "Personal"}),
+        ticket("3", **{"Created By": "Ayesha Khan"}),
+    ]))
+
+    assert index.tickets == {}
+
+
+def test_saved_index_keeps_no_ticket_text(tmp_path):
+    index = EscalationIndex()
+    index.sync(pd.DataFrame([ticket("1")]))
+    index.save(tmp_path / "index.json")
+
+    assert "Printer jammed" not in (tmp_path / "index.json").read_text()
+    assert "Issue" not in EscalationIndex.load(tmp_path / "index.json").tickets["1"]
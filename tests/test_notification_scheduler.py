@@ -0,0 +1,25 @@
+from notification_scheduler import NotificationScheduler
+
+
+def test_failed_delivery_keeps_the_batch_and_sends_the_others():
+    sent, followed_up = [], []
+
+    def deliver(user_id, text, urgent):
+        if user_id == "U1" and not sent:
+            raise ConnectionError("Slack unreachable")
+        sent.append((user_id, text))
+
+    scheduler = NotificationScheduler(deliver, interval=3600)
+    scheduler.submit("U1", "first", "Low", then=lambda: followed_up.append("first"))
+    scheduler.submit("U2", "second", "Low", then=lambda: followed_up.append("second"))
+    scheduler.flush()
+
+    assert sent == [("U2", "second")]
+    assert followed_up == ["second"]
+    assert scheduler.snapshot()["messages_waiting"] == 1
+
+    scheduler.flush()
+
+    assert sent == [("U2", "second"), ("U1", "first")]
+    assert followed_up == ["second", "first"]
+    assert scheduler.snapshot()["messages_waiting"] == 0
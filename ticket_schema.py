@@ -0,0 +1,195 @@
+import datetime
+import itertools
+import re
+
+import numpy as np
+import pandas as pd
+
+# Columns of a ticket as the app shows it and as bulk_tickets.py exports and imports it.
+TICKET_COLUMNS = ["ID", "Issue", "Status", "Priority", "Date Submitted", "Submitted Time", "Created By",
+                  "Assigned To", "Resolved Date", "Resolved Time", "Comments", "Ticket Type", "Notify"]
+
+STATUSES = ("Open", "In Progress", "Closed")
+PRIORITIES = ("High", "Medium", "Low")
+
+# Issues mentioning any of these are print orders: physical copies the admin has to send out.
+PRINT_PATTERN = re.compile(r"Printed|Complimentary|Proof", re.IGNORECASE)
+
+# Notion rejects rich text segments longer than this.
+RICH_TEXT_LIMIT = 2000
+
+
+def rich_text(value):
+    """Notion rich_text value for a string, split into segments Notion accepts."""
+    value = str(value)
+    return [{"text": {"content": value[i:i + RICH_TEXT_LIMIT]}}
+            for i in range(0, len(value), RICH_TEXT_LIMIT)] or [{"text": {"content": ""}}]
+
+
+def classify_ticket(issue):
+    """Category of a ticket from its Issue text: "Printing" for print orders, otherwise "General"."""
+    return "Printing" if PRINT_PATTERN.search(str(issue or "")) else "General"
+
+
+def ticket_number(ticket_id):
+    """Numeric part of a "TICKET-123" ID, or 0 if there is none."""
+    try:
+        return int(str(ticket_id).split("-")[1])
+    except (IndexError, ValueError):
+        return 0
+
+
+def ticket_properties(ticket):
+    """Notion properties for creating a ticket page from a ticket dict keyed by TICKET_COLUMNS.
+
+    Resolved Date, Resolved Time and Comments are only written when present; the
+    Ticket Type is derived from Created By and Assigned To when it is not given.
+    """
+    ticket_type = ticket.get("Ticket Type") or ("Personal" if ticket["Created By"] == ticket["Assigned To"]
+                                                else "Normal")
+    properties = {
+        "ID": {"title": [{"text": {"content": ticket["ID"]}}]},
+        "Issue": {"rich_text": rich_text(ticket["Issue"])},
+        "Status": {"select": {"name": ticket["Status"]}},
+        "Priority": {"select": {"name": ticket["Priority"]}},
+        "Created By": {"select": {"name": ticket["Created By"]}},
+        "Assigned To": {"select": {"name": ticket["Assigned To"]}},
+        "Date Submitted": {"date": {"start": ticket["Date Submitted"]}},
+        "Submitted Time": {"rich_text": rich_text(ticket["Submitted Time"])},
+        "Ticket Type": {"rich_text": rich_text(ticket_type)},
+        "Notify": {"rich_text": rich_text(ticket.get("Notify") or "Yes")},
+    }
+    if ticket.get("Resolved Date"):
+        properties["Resolved Date"] = {"date": {"start": ticket["Resolved Date"]}}
+    if ticket.get("Resolved Time"):
+        properties["Resolved Time"] = {"rich_text": rich_text(ticket["Resolved Time"])}
+    if ticket.get("Comments"):
+        properties["Comments"] = {"rich_text": rich_text(ticket["Comments"])}
+    return properties
+
+
+def parse_date(value):
+    """ISO date string for "2025-01-31", "31-January-2025" or "31/01/2025", or None."""
+    value = str(value or "").strip()
+    for fmt, text in (("%Y-%m-%d", value[:10]), ("%d-%B-%Y", value), ("%d/%m/%Y", value)):
+        try:
+            return datetime.datetime.strptime(text, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def _join(segments):
+    return "".join(segment.get("plain_text") or segment.get("text", {}).get("content", "") for segment in segments)
+
+
+def _text(value, default=""):
+    if not value:
+        return default
+    if len(value) == 1 and "plain_text" in value[0]:
+        return value[0]["plain_text"]
+    return _join(value)
+
+
+def _select(value, default=""):
+    return value and value.get("name") or default
+
+
+def _date(value, default=""):
+    return value and value.get("start") or default
+
+
+# Turns a property's typed payload into a column value.
+PROPERTY_EXTRACTORS = {"title": _text, "rich_text": _text, "select": _select, "date": _date}
+
+# How each ticket column is read from a Notion page: (column, property type, value when empty).
+# Text columns join every rich_text segment, since Notion splits long text into several.
+PAGE_SCHEMA = [
+    ("ID", "title", ""),
+    ("Issue", "rich_text", ""),
+    ("Status", "select", "Open"),
+    ("Priority", "select", "Medium"),
+    ("Date Submitted", "date", ""),
+    ("Submitted Time", "rich_text", ""),
+    ("Created By", "select", ""),
+    ("Assigned To", "select", ""),
+    ("Resolved Date", "date", None),
+    ("Resolved Time", "rich_text", ""),
+    ("Comments", "rich_text", ""),
+    ("Ticket Type", "rich_text", ""),
+    ("Notify", "rich_text", ""),
+]
+DECODED_COLUMNS = ["page_id"] + [column for column, _, _ in PAGE_SCHEMA]
+
+
+def _page_text(value):
+    return value[0]["plain_text"] if len(value) == 1 else "".join([segment["plain_text"] for segment in value])
+
+
+def _page_row(page):
+    """A page's values in DECODED_COLUMNS order, for a page with every property in PAGE_SCHEMA.
+
+    This is PAGE_SCHEMA written out, which decodes about as fast as the old per-row parser;
+    a page missing a property raises and is decoded by _schema_row() instead.
+    """
+    props = page["properties"]
+    status, priority = props["Status"]["select"], props["Priority"]["select"]
+    created_by, assigned_to = props["Created By"]["select"], props["Assigned To"]["select"]
+    submitted, resolved = props["Date Submitted"]["date"], props["Resolved Date"]["date"]
+    return (
+        page["id"],
+        _page_text(props["ID"]["title"]),
+        _page_text(props["Issue"]["rich_text"]),
+        status and status["name"] or "Open",
+        priority and priority["name"] or "Medium",
+        submitted and submitted["start"] or "",
+        _page_text(props["Submitted Time"]["rich_text"]),
+        created_by and created_by["name"] or "",
+        assigned_to and assigned_to["name"] or "",
+        resolved and resolved["start"] or None,
+        _page_text(props["Resolved Time"]["rich_text"]),
+        _page_text(props["Comments"]["rich_text"]),
+        _page_text(props["Ticket Type"]["rich_text"]),
+        _page_text(props["Notify"]["rich_text"]),
+    )
+
+
+def _schema_row(page):
+    """A page's values in DECODED_COLUMNS order; missing properties take the column's empty value."""
+    props = page["properties"]
+    return (page["id"], *[PROPERTY_EXTRACTORS[prop_type]((props.get(column) or {}).get(prop_type), default)
+                          for column, prop_type, default in PAGE_SCHEMA])
+
+
+def decode_pages(pages):
+    """Ticket columns for a list of Notion pages, as object arrays; pages without a usable ID get the placeholder ID.
+
+    The rows go into one 2D object array and each column is a view of it, which is
+    cheaper than transposing them into lists.
+    """
+    rows = []
+    for page in pages:
+        try:
+            rows.append(_page_row(page))
+        except (KeyError, TypeError):
+            rows.append(_schema_row(page))
+    values = np.fromiter(itertools.chain.from_iterable(rows), dtype=object,
+                         count=len(rows) * len(DECODED_COLUMNS)).reshape(len(rows), len(DECODED_COLUMNS))
+    columns = {column: values[:, i] for i, column in enumerate(DECODED_COLUMNS)}
+    columns["ID"] = np.array([ticket_id if "-" in ticket_id else "TICKET-0001" for ticket_id in columns["ID"]],
+                             dtype=object)
+    return columns
+
+
+def columns_frame(columns):
+    """DataFrame of decoded ticket columns.
+
+    decode_pages() already returns object arrays, so pandas skips its per-column type
+    inference, which otherwise takes about as long as decoding the pages.
+    """
+    return pd.DataFrame(columns)
+
+
+def parse_ticket_page(page):
+    """Turn a raw Notion page into a ticket dict."""
+    return {column: values[0] for column, values in decode_pages([page]).items()}
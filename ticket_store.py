@@ -0,0 +1,409 @@
+import argparse
+import contextlib
+import datetime
+import os
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+from archive import query_pages
+from ticket_schema import TICKET_COLUMNS, classify_ticket, decode_pages, ticket_number
+
+TICKET_STORE_PATH = os.getenv("TICKET_STORE_PATH", ".ticket_store.sqlite3")
+FULL_SYNC_HOURS = float(os.getenv("TICKET_STORE_FULL_SYNC_HOURS", 24))
+# Loading text for more stale tickets than this reads the whole data source instead of page by page.
+TEXT_QUERY_THRESHOLD = int(os.getenv("TICKET_STORE_TEXT_QUERY_THRESHOLD", 50))
+
+# Derived at ingest from the Notion properties rather than read from Notion.
+DERIVED_COLUMNS = ["Category"]
+
+COLUMNS = ["page_id"] + TICKET_COLUMNS + DERIVED_COLUMNS
+# Long free text, left out of full passes and loaded per ticket by load_text().
+TEXT_COLUMNS = ["Issue", "Comments"]
+SUMMARY_COLUMNS = [column for column in TICKET_COLUMNS if column not in TEXT_COLUMNS]
+TIME_COLUMNS = ["created_time", "last_edited_time"]
+INDEXED_COLUMNS = ["Status", "Assigned To", "Created By", "Ticket Type", "Date Submitted", "Category"]
+# Fields whose changes are written to the event log; tickets appearing and disappearing are logged too.
+EVENT_FIELDS = ["Status", "Priority", "Assigned To", "Resolved Date", "Notify", "Issue", "Comments"]
+EVENT_COLUMNS = ["id", "page_id", "ticket_id", "field", "old_value", "new_value", "changed_at", "recorded_at",
+                 "source", "actor"]
+
+
+def quote(column):
+    return '"' + column.replace('"', '""') + '"'
+
+
+def timestamp(value=None):
+    """A UTC time in the format Notion uses for created_time and last_edited_time; now by default."""
+    value = value or datetime.datetime.now(datetime.timezone.utc)
+    return value.astimezone(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+class TicketStore:
+    """SQLite mirror of the ticket data source that both the app and reminder.py read from.
+
+    sync() only asks Notion for pages edited since the newest edit already mirrored.
+    Deleted and trashed pages never show up in those queries, so every
+    `full_sync_hours` a full pass re-reads the data source and drops rows that are gone.
+    Full passes, including the first one, ask Notion for the summary properties only
+    (filter_properties), leaving Issue and Comments out of the payload; rows whose text
+    is missing or older than their last edit are filled in by load_text().
+    Reads go through indexes on the columns tickets are filtered by and make no API calls.
+    Each ticket's Category is classified when its text is mirrored, and only again if its Issue changes.
+
+    Every change the mirror takes in, from a sync or from an edit the app reports with
+    record_edit(), is appended to an events table indexed by ticket and by time, so
+    history, timelines and "what changed since" questions are answered by events()
+    without calling Notion. Consumers keep their place in the log with cursor().
+    """
+
+    def __init__(self, path=TICKET_STORE_PATH, full_sync_hours=FULL_SYNC_HOURS):
+        self.path = path
+        self.full_sync_hours = full_sync_hours
+        self.lock = threading.Lock()
+        self.last_sync = {}
+        self.property_ids = {}
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with contextlib.closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            columns = ", ".join(f"{quote(column)} TEXT" for column in COLUMNS[1:])
+            conn.execute(f"CREATE TABLE IF NOT EXISTS tickets (page_id TEXT PRIMARY KEY, {columns}, "
+                         f"created_time TEXT, last_edited_time TEXT, text_edited_time TEXT)")
+            existing = {row[1] for row in conn.execute("PRAGMA table_info(tickets)")}
+            for column in DERIVED_COLUMNS:
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE tickets ADD COLUMN {quote(column)} TEXT")
+            if "text_edited_time" not in existing:
+                # Mirrors from before summary passes hold the full text of every row.
+                conn.execute("ALTER TABLE tickets ADD COLUMN text_edited_time TEXT")
+                conn.execute("UPDATE tickets SET text_edited_time = last_edited_time")
+            unclassified = conn.execute('SELECT page_id, "Issue" FROM tickets '
+                                        'WHERE "Category" IS NULL AND "Issue" IS NOT NULL').fetchall()
+            conn.executemany('UPDATE tickets SET "Category" = ? WHERE page_id = ?',
+                             [(classify_ticket(issue), page_id) for page_id, issue in unclassified])
+            for column in INDEXED_COLUMNS:
+                name = "idx_tickets_" + column.lower().replace(" ", "_")
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON tickets ({quote(column)})")
+            conn.execute("CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT)")
+            conn.execute("CREATE TABLE IF NOT EXISTS events (id INTEGER PRIMARY KEY AUTOINCREMENT, page_id TEXT, "
+                         "ticket_id TEXT, field TEXT, old_value TEXT, new_value TEXT, changed_at TEXT, "
+                         "recorded_at TEXT, source TEXT, actor TEXT)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_events_page_id ON events (page_id, id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_events_changed_at ON events (changed_at)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    @staticmethod
+    def _rows(pages, columns, known=None):
+        """Table rows of the given columns for pages.
+
+        With text columns, `known` maps page_id to the (Issue, Category) already mirrored.
+        """
+        decoded = decode_pages(pages)
+        if "Category" in columns:
+            decoded["Category"] = []
+            for page_id, issue in zip(decoded["page_id"], decoded["Issue"]):
+                known_issue, category = known.get(page_id, (None, None))
+                decoded["Category"].append(category if known_issue == issue and category else classify_ticket(issue))
+        for column in ("Date Submitted", "Resolved Date"):
+            decoded[column] = [value or None for value in decoded[column]]
+        decoded["created_time"] = [page.get("created_time", "") for page in pages]
+        decoded["last_edited_time"] = [page.get("last_edited_time", "") for page in pages]
+        decoded["text_edited_time"] = decoded["last_edited_time"]
+        return list(zip(*(decoded[column] for column in columns)))
+
+    @staticmethod
+    def _current(conn, page_ids, columns):
+        """page_id -> tuple of the given columns as mirrored, looked up in chunks SQLite accepts."""
+        current = {}
+        for start in range(0, len(page_ids), 500):
+            chunk = list(page_ids[start:start + 500])
+            placeholders = ", ".join("?" * len(chunk))
+            current.update((row[0], row[1:]) for row in conn.execute(
+                f"SELECT page_id, {', '.join(map(quote, columns))} FROM tickets WHERE page_id IN ({placeholders})",
+                chunk))
+        return current
+
+    def _log_changes(self, conn, rows, columns, source="sync", actor=None):
+        """Append an event for every EVENT_FIELDS value in `rows` that differs from the mirrored row.
+
+        Call before writing the rows. Text that was never loaded is not logged as a change,
+        and a page not mirrored yet is logged once as "created".
+        """
+        fields = [field for field in EVENT_FIELDS if field in columns]
+        position = {column: i for i, column in enumerate(columns)}
+        edited_at = position.get("last_edited_time", position.get("text_edited_time"))
+        current = self._current(conn, [row[position["page_id"]] for row in rows], ["ID"] + fields)
+        recorded_at = timestamp()
+        events = []
+        for row in rows:
+            page_id = row[position["page_id"]]
+            changed_at = row[edited_at] if edited_at is not None else recorded_at
+            if page_id not in current:
+                if "created_time" in position:
+                    events.append((page_id, row[position["ID"]], "created", None, None,
+                                   row[position["created_time"]] or changed_at, recorded_at, source, actor))
+                continue
+            old = current[page_id]
+            for field, before in zip(fields, old[1:]):
+                after = row[position[field]]
+                if before != after and not (field in TEXT_COLUMNS and before is None):
+                    events.append((page_id, old[0], field, before, after, changed_at, recorded_at, source, actor))
+        conn.executemany(f"INSERT INTO events ({', '.join(EVENT_COLUMNS[1:])}) "
+                         f"VALUES ({', '.join('?' * (len(EVENT_COLUMNS) - 1))})", events)
+        return len(events)
+
+    def _property_ids(self, notion, data_source_id, names, governor=None):
+        """Notion property IDs for property names, as filter_properties expects them."""
+        if not self.property_ids:
+            retrieve = notion.data_sources.retrieve
+            schema = (governor.call("notion", retrieve, data_source_id=data_source_id) if governor
+                      else retrieve(data_source_id=data_source_id))
+            self.property_ids = {name: prop["id"] for name, prop in schema["properties"].items()}
+        return [self.property_ids[name] for name in names if name in self.property_ids]
+
+    def sync(self, notion, data_source_id, full=False, governor=None):
+        """Mirror pages edited since the last sync, or the summary of every page on a full pass.
+
+        Returns pages read.
+        """
+        started = time.perf_counter()
+        with self.lock, contextlib.closing(self._connect()) as conn:
+            state = dict(conn.execute("SELECT key, value FROM sync_state").fetchall())
+            newest = state.get("last_edited_time", "")
+            full = (full or not newest
+                    or time.time() - float(state.get("last_full_sync", 0)) > self.full_sync_hours * 3600)
+
+            query_filter = None
+            if not full:
+                # Notion rounds edit times to the minute, so re-read the newest minute already seen.
+                query_filter = {"timestamp": "last_edited_time", "last_edited_time": {"on_or_after": newest}}
+
+            if full:
+                # Issue and Comments stay as mirrored; rows edited since are left for load_text().
+                columns = ["page_id"] + SUMMARY_COLUMNS + TIME_COLUMNS
+                filter_properties = self._property_ids(notion, data_source_id, SUMMARY_COLUMNS, governor)
+                pages = list(query_pages(notion, data_source_id, governor=governor,
+                                         filter_properties=filter_properties))
+                rows = self._rows(pages, columns)
+            else:
+                columns = COLUMNS + TIME_COLUMNS + ["text_edited_time"]
+                pages = list(query_pages(notion, data_source_id, query_filter, governor))
+                rows = self._rows(pages, columns,
+                                  self._current(conn, [page["id"] for page in pages], ["Issue", "Category"]))
+            newest = max([newest] + [page.get("last_edited_time", "") for page in pages])
+
+            updates = ", ".join(f"{quote(column)} = excluded.{quote(column)}" for column in columns[1:])
+            with conn:
+                events = self._log_changes(conn, rows, columns)
+                conn.executemany(f"INSERT INTO tickets ({', '.join(map(quote, columns))}) "
+                                 f"VALUES ({', '.join('?' * len(columns))}) "
+                                 f"ON CONFLICT(page_id) DO UPDATE SET {updates}", rows)
+                if full:
+                    conn.execute("CREATE TEMP TABLE seen (page_id TEXT PRIMARY KEY)")
+                    conn.executemany("INSERT OR IGNORE INTO seen VALUES (?)", [(row[0],) for row in rows])
+                    deleted = conn.execute('SELECT page_id, "ID" FROM tickets '
+                                           'WHERE page_id NOT IN (SELECT page_id FROM seen)').fetchall()
+                    now = timestamp()
+                    conn.executemany(f"INSERT INTO events ({', '.join(EVENT_COLUMNS[1:])}) "
+                                     f"VALUES (?, ?, 'deleted', NULL, NULL, ?, ?, 'sync', NULL)",
+                                     [(page_id, ticket_id, now, now) for page_id, ticket_id in deleted])
+                    events += len(deleted)
+                    conn.execute("DELETE FROM tickets WHERE page_id NOT IN (SELECT page_id FROM seen)")
+                    conn.execute("INSERT OR REPLACE INTO sync_state VALUES ('last_full_sync', ?)", (str(time.time()),))
+                conn.execute("INSERT OR REPLACE INTO sync_state VALUES ('last_edited_time', ?)", (newest,))
+
+            self.last_sync = {"mode": "full" if full else "incremental", "pages": len(rows), "events": events,
+                              "seconds": round(time.perf_counter() - started, 3)}
+            print(f"🔄 Ticket store {self.last_sync['mode']} sync: {len(rows)} page(s), {events} change(s)")
+            return len(rows)
+
+    def load_text(self, notion, data_source_id, page_ids=None, governor=None):
+        """Mirror Issue and Comments for tickets whose text is missing or older than their last edit.
+
+        Only the given tickets are checked when `page_ids` is passed. A handful are read
+        page by page; past TEXT_QUERY_THRESHOLD one query over the data source fetches
+        the text properties of every ticket instead. Returns tickets loaded.
+        """
+        stale_clause = "(text_edited_time IS NULL OR text_edited_time != last_edited_time)"
+        with contextlib.closing(self._connect()) as conn:
+            if page_ids is None:
+                stale = [row[0] for row in conn.execute(f"SELECT page_id FROM tickets WHERE {stale_clause}")]
+            else:
+                stale = []
+                for start in range(0, len(page_ids), 500):
+                    chunk = list(page_ids[start:start + 500])
+                    placeholders = ", ".join("?" * len(chunk))
+                    stale.extend(row[0] for row in conn.execute(
+                        f"SELECT page_id FROM tickets WHERE page_id IN ({placeholders}) AND {stale_clause}", chunk))
+            if not stale:
+                return 0
+
+            started = time.perf_counter()
+            filter_properties = self._property_ids(notion, data_source_id, TEXT_COLUMNS, governor)
+            if len(stale) > TEXT_QUERY_THRESHOLD:
+                wanted = set(stale)
+                pages = [page for page in query_pages(notion, data_source_id, governor=governor,
+                                                      filter_properties=filter_properties)
+                         if page["id"] in wanted]
+            else:
+                pages = []
+                retrieve = notion.pages.retrieve
+                for page_id in stale:
+                    try:
+                        pages.append(governor.call("notion", retrieve, page_id=page_id,
+                                                   filter_properties=filter_properties) if governor
+                                     else retrieve(page_id=page_id, filter_properties=filter_properties))
+                    except Exception as e:
+                        print(f"❌ Error loading text for ticket {page_id}: {e}")
+
+            columns = TEXT_COLUMNS + ["Category", "text_edited_time", "page_id"]
+            with self.lock, conn:
+                rows = self._rows(pages, columns,
+                                  self._current(conn, [page["id"] for page in pages], ["Issue", "Category"]))
+                self._log_changes(conn, rows, columns)
+                conn.executemany('UPDATE tickets SET "Issue" = ?, "Comments" = ?, "Category" = ?, '
+                                 'text_edited_time = ? WHERE page_id = ?', rows)
+            print(f"📝 Ticket store loaded text for {len(rows)} of {len(stale)} stale ticket(s) "
+                  f"in {time.perf_counter() - started:.2f}s")
+            return len(rows)
+
+    def texts(self, page_ids):
+        """page_id -> {"Issue", "Comments", "Category"} as mirrored, for the given tickets."""
+        texts = {}
+        with contextlib.closing(self._connect()) as conn:
+            for start in range(0, len(page_ids), 500):
+                chunk = list(page_ids[start:start + 500])
+                placeholders = ", ".join("?" * len(chunk))
+                for page_id, issue, comments, category in conn.execute(
+                        f'SELECT page_id, "Issue", "Comments", "Category" FROM tickets '
+                        f'WHERE page_id IN ({placeholders})', chunk):
+                    texts[page_id] = {"Issue": issue, "Comments": comments, "Category": category}
+        return texts
+
+    def highest_ticket_number(self):
+        """Highest TICKET-n number among the mirrored tickets, or 0 when there are none."""
+        with contextlib.closing(self._connect()) as conn:
+            return max((ticket_number(ticket_id) for ticket_id, in conn.execute('SELECT "ID" FROM tickets')),
+                       default=0)
+
+    def record_edit(self, page_id, values, actor=None, source="app"):
+        """Mirror field values an edit just wrote to Notion and log what they changed.
+
+        The next sync then finds nothing new to log for the edit, and the event keeps
+        who made it. Tickets not mirrored yet are left to the sync. Returns changes logged.
+        """
+        columns = [column for column in TICKET_COLUMNS if column in values]
+        row = ([values[column] or None if column in ("Date Submitted", "Resolved Date") else values[column]
+                for column in columns]
+               + [page_id, values.get("last_edited_time") or timestamp()])
+        columns += ["page_id", "last_edited_time"]
+        with self.lock, contextlib.closing(self._connect()) as conn, conn:
+            known = self._current(conn, [page_id], ["Issue", "Category"])
+            if page_id not in known:
+                return 0
+            events = self._log_changes(conn, [row], columns, source, actor)
+            updates = [f"{quote(column)} = ?" for column in columns[:-2]]
+            params = row[:-2]
+            if "Issue" in values and values["Issue"] != known[page_id][0]:
+                updates.append('"Category" = ?')
+                params.append(classify_ticket(values["Issue"]))
+            if updates:
+                conn.execute(f"UPDATE tickets SET {', '.join(updates)} WHERE page_id = ?", params + [page_id])
+            return events
+
+    def events(self, page_id=None, since=None, after_id=None, fields=None, limit=None):
+        """Logged ticket changes as a DataFrame, oldest first.
+
+        `since` is a datetime compared with when the change was made in Notion; `after_id`
+        keeps events logged after that event id. `limit` keeps the newest ones.
+        """
+        clauses, params = [], []
+        if page_id:
+            clauses.append("page_id = ?")
+            params.append(page_id)
+        if since is not None:
+            clauses.append("changed_at >= ?")
+            params.append(timestamp(since))
+        if after_id is not None:
+            clauses.append("id > ?")
+            params.append(after_id)
+        if fields:
+            clauses.append(f"field IN ({', '.join('?' * len(fields))})")
+            params.extend(fields)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        query = f"SELECT {', '.join(EVENT_COLUMNS)} FROM events {where} ORDER BY id DESC"
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        with contextlib.closing(self._connect()) as conn:
+            df = pd.read_sql_query(query, conn, params=params)
+        return df.iloc[::-1].reset_index(drop=True)
+
+    def cursor(self, name):
+        """The last event id consumer `name` has handled, or None before its first run."""
+        with contextlib.closing(self._connect()) as conn:
+            row = conn.execute("SELECT value FROM sync_state WHERE key = ?", (f"events_cursor:{name}",)).fetchone()
+        return int(row[0]) if row else None
+
+    def set_cursor(self, name, event_id=None):
+        """Record that consumer `name` has handled every event up to event_id, or up to the newest one."""
+        with contextlib.closing(self._connect()) as conn, conn:
+            if event_id is None:
+                event_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()[0]
+            conn.execute("INSERT OR REPLACE INTO sync_state VALUES (?, ?)", (f"events_cursor:{name}", str(event_id)))
+        return event_id
+
+    def read(self, statuses=None, assigned_to=None, created_by=None, ticket_type=None, hot_since=None,
+             category=None):
+        """Tickets matching the given filters as a DataFrame in creation order, with their last_edited_time.
+
+        `hot_since` keeps tickets that are not closed or were submitted on or after that date.
+        """
+        clauses, params = [], []
+        if statuses:
+            clauses.append(f'"Status" IN ({", ".join("?" * len(statuses))})')
+            params.extend(statuses)
+        for column, value in (("Assigned To", assigned_to), ("Created By", created_by), ("Ticket Type", ticket_type),
+                              ("Category", category)):
+            if value:
+                clauses.append(f"{quote(column)} = ?")
+                params.append(value)
+        if hot_since:
+            clauses.append('("Status" != \'Closed\' OR "Date Submitted" >= ? OR "Date Submitted" IS NULL)')
+            params.append(hot_since.isoformat())
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with contextlib.closing(self._connect()) as conn:
+            df = pd.read_sql_query(f"SELECT {', '.join(map(quote, COLUMNS))}, last_edited_time FROM tickets {where} "
+                                   f"ORDER BY created_time, rowid", conn, params=params)
+
+        df["Date Submitted"] = pd.to_datetime(df["Date Submitted"], format="%Y-%m-%d", errors='coerce')
+        df["Resolved Date"] = pd.to_datetime(df["Resolved Date"], format="%Y-%m-%d", errors='coerce')
+        return df
+
+
+if __name__ == "__main__":
+    from notion_client import Client
+
+    parser = argparse.ArgumentParser(description="Keep the local SQLite mirror of the ticket data source in sync.")
+    parser.add_argument("--path", default=TICKET_STORE_PATH)
+    parser.add_argument("--full", action="store_true", help="re-read every page and drop deleted ones")
+    parser.add_argument("--every", type=float, help="keep running and sync every this many seconds")
+    args = parser.parse_args()
+
+    notion = Client(auth=os.environ["NOTION_TOKEN"])
+    data_source_id = os.getenv("NOTION_DATASOURCE_ID") or os.environ["NOTION_DATABASE_ID"]
+    store = TicketStore(args.path)
+    while True:
+        try:
+            store.sync(notion, data_source_id, full=args.full)
+            store.load_text(notion, data_source_id)
+        except Exception as e:
+            print(f"❌ Error syncing ticket store: {e}")
+        if not args.every:
+            break
+        time.sleep(args.every)